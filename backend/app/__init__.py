@@ -1,7 +1,17 @@
 from flask import Flask
 from flask_cors import CORS
-from .models import db, Admin
+from .models import db
 from .routes import api, admin_bp
+from .history import init_history
+from .cache import init_cache
+from .parallel import init_parallel
+from .instrumentation import init_instrumentation
+from .auth import init_auth
+from .login import init_login
+from .snapshot import init_snapshot
+from .compression import init_compression
+from .json_provider import init_json
+from .bootstrap import bootstrap_database
 from config import Config
 
 def create_app(config_class=Config):
@@ -10,7 +20,16 @@ def create_app(config_class=Config):
     app.config.from_object(config_class)
     
     # Initialize extensions
+    init_json(app)
     db.init_app(app)
+    init_history(app)
+    init_cache(app)
+    init_parallel(app)
+    init_instrumentation(app)
+    init_auth(app)
+    init_login(app)
+    init_snapshot(app)
+    init_compression(app)
     
     # Configure CORS
     # تم التعديل هنا للسماح للجميع (*)
@@ -25,16 +44,12 @@ def create_app(config_class=Config):
     app.register_blueprint(api, url_prefix='/api/v1')
     app.register_blueprint(admin_bp, url_prefix='/api/v1/admin')
     
-    # Create tables and default admin
-    with app.app_context():
-        db.create_all()
-        
-        # Create default admin if not exists
-        if not Admin.query.filter_by(username='admin').first():
-            admin = Admin(username='admin')
-            admin.set_password('admin123')  # Default password
-            db.session.add(admin)
-            db.session.commit()
-            print("✅ Default admin created (username: admin, password: admin123)")
+    # Create tables and default admin. Production runs `run.py bootstrap`
+    # once instead (DB_BOOTSTRAP=0), so workers boot without touching the
+    # database; the gift index and catalog snapshot are built on first use
+    if app.config['DB_BOOTSTRAP']:
+        with app.app_context():
+            if bootstrap_database():
+                print("✅ Default admin created (username: admin, password: admin123)")
     
     return app
@@ -0,0 +1,147 @@
+"""
+Admin authentication (JWT)
+Tokens issued by /admin/login carry exp/iat. Verified tokens are kept in a
+bounded per-process cache keyed by their SHA-256 digest, so repeated admin
+requests skip the signature check. A cached token is dropped at its exp
+and re-checked against the admins table every JWT_REVALIDATE_SECONDS, so
+deleting an admin revokes their tokens within that window.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Dict, Optional
+
+import jwt
+from flask import current_app, jsonify, request
+from sqlalchemy import select
+
+from .models import db, Admin
+
+JWT_SECRET = os.getenv("JWT_SECRET", "super-secret-key")
+JWT_ALGORITHM = "HS256"
+
+
+class NotAdminError(jwt.InvalidTokenError):
+    """A valid token without the admin role."""
+
+
+class TokenCache:
+    """LRU of verified token payloads: digest -> (payload, exp, checked_at)."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[bytes, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'revalidations': 0}
+
+    def get(self, digest: bytes) -> Optional[tuple]:
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(digest)
+            self._stats['hits'] += 1
+            return entry
+
+    def set(self, digest: bytes, payload: Dict[str, Any], checked_at: float) -> None:
+        with self._lock:
+            self._entries[digest] = (payload, payload['exp'], checked_at)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, digest: bytes) -> None:
+        with self._lock:
+            self._entries.pop(digest, None)
+
+    def revalidated(self) -> None:
+        with self._lock:
+            self._stats['revalidations'] += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries))
+
+
+def issue_admin_token(admin: Admin) -> str:
+    now = int(time.time())
+    token = jwt.encode(
+        {"role": "admin", "admin_id": admin.id, "iat": now,
+         "exp": now + current_app.config["JWT_EXPIRES_SECONDS"]},
+        JWT_SECRET,
+        algorithm=JWT_ALGORITHM,
+    )
+    return token.decode("utf-8") if isinstance(token, bytes) else token
+
+
+def _admin_exists(admin_id: Any) -> bool:
+    return db.session.execute(select(Admin.id).where(Admin.id == admin_id)).first() is not None
+
+
+def verify_admin_token(token: str) -> Dict[str, Any]:
+    """
+    Payload of a valid admin token. Raises jwt.ExpiredSignatureError,
+    NotAdminError or another jwt.InvalidTokenError otherwise.
+    """
+    cache = current_app.extensions.get("token_cache")
+    digest = hashlib.sha256(token.encode("utf-8")).digest()
+    now = time.time()
+
+    entry = cache.get(digest) if cache is not None else None
+    if entry is not None:
+        payload, exp, checked_at = entry
+        if exp <= now:
+            cache.discard(digest)
+            raise jwt.ExpiredSignatureError("Signature has expired")
+        if now - checked_at < current_app.config["JWT_REVALIDATE_SECONDS"]:
+            return payload
+        cache.revalidated()
+    else:
+        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM],
+                             options={"require": ["exp", "iat"]})
+        if payload.get("role") != "admin":
+            raise NotAdminError("Not an admin token")
+
+    if not _admin_exists(payload.get("admin_id")):
+        if cache is not None:
+            cache.discard(digest)
+        raise jwt.InvalidTokenError("Unknown admin")
+    if cache is not None:
+        cache.set(digest, payload, now)
+    return payload
+
+
+def admin_required(f):
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        auth_header = request.headers.get("Authorization")
+
+        if not auth_header or not auth_header.startswith("Bearer "):
+            return jsonify({"error": "Authorization header missing"}), 401
+
+        try:
+            verify_admin_token(auth_header.split(" ")[1])
+        except jwt.ExpiredSignatureError:
+            return jsonify({"error": "Token expired"}), 401
+        except NotAdminError:
+            return jsonify({"error": "Unauthorized"}), 401
+        except jwt.InvalidTokenError:
+            return jsonify({"error": "Invalid token"}), 401
+
+        return f(*args, **kwargs)
+    return decorated
+
+
+def init_auth(app) -> None:
+    """Attach the verified-token cache (JWT_CACHE_SIZE 0 disables it)."""
+    if app.config.get("JWT_CACHE_SIZE"):
+        app.extensions["token_cache"] = TokenCache(app.config["JWT_CACHE_SIZE"])
+
+
+def token_cache_metrics() -> Optional[Dict[str, Any]]:
+    cache = current_app.extensions.get("token_cache")
+    return cache.metrics() if cache is not None else None
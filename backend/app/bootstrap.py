@@ -0,0 +1,31 @@
+"""
+Database bootstrap
+Creates missing tables and indexes, the catalog version row and the
+default admin. Production runs it once per deployment (`python run.py
+bootstrap`) and starts gunicorn with DB_BOOTSTRAP=0. Otherwise every
+worker would repeat the DDL introspection at boot, hash a password on a
+fresh database, and race the other workers to create the same tables
+and rows.
+"""
+from flask import current_app
+
+from .catalog import ensure_catalog_state
+from .models import db, Admin, ensure_indexes
+
+DEFAULT_ADMIN_USERNAME = 'admin'
+DEFAULT_ADMIN_PASSWORD = 'admin123'
+
+
+def bootstrap_database() -> bool:
+    """Bring the schema up to date (inside an app context); True if the default admin was created."""
+    db.create_all()
+    ensure_indexes()
+    ensure_catalog_state()
+
+    if Admin.query.filter_by(username=DEFAULT_ADMIN_USERNAME).first():
+        return False
+    admin = Admin(username=DEFAULT_ADMIN_USERNAME)
+    admin.set_password(DEFAULT_ADMIN_PASSWORD, current_app.config['PASSWORD_HASH_METHOD'])
+    db.session.add(admin)
+    db.session.commit()
+    return True
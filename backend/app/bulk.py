@@ -0,0 +1,231 @@
+"""
+Bulk admin changes
+Creates, updates or deletes many stores / gifts in one transaction with a
+single catalog version bump, so the gift index and the result caches are
+invalidated once per request instead of once per row. Items are validated
+up front and flushed together; only when that flush fails is each item
+retried in its own savepoint to find and report the offending ones.
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from .catalog import bump_catalog_version, forget_catalog_state
+from .models import db, Store, Gift
+from .recommendation import normalize_interests
+
+# Columns clients may not set
+_READ_ONLY = {'id', 'created_at'}
+# Rows per IN (...) clause when loading or deleting by id
+_CHUNK = 500
+
+
+def _columns(model) -> Dict[str, Any]:
+    return {c.name: c for c in model.__table__.columns if c.name not in _READ_ONLY}
+
+
+def clean_fields(model, data: Any, partial: bool = False) -> Dict[str, Any]:
+    """
+    Validated column values of one item (raises ValueError). With
+    ``partial`` only the given fields are checked, as for an update.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("expected an object")
+    columns = _columns(model)
+    unknown = sorted(set(data) - set(columns))
+    if unknown:
+        raise ValueError(f"unknown fields: {', '.join(unknown)}")
+
+    values = {}
+    for name, value in data.items():
+        column = columns[name]
+        if value is None:
+            if not column.nullable:
+                raise ValueError(f"{name} cannot be null")
+        elif name == 'interests':
+            if not isinstance(value, list):
+                raise ValueError("interests must be a list")
+            value = normalize_interests(value)
+        elif isinstance(value, bool) or not isinstance(value, (str, int, float)):
+            raise ValueError(f"invalid value for {name}")
+        else:
+            kind = column.type.python_type
+            try:
+                value = kind(value) if kind is not str else value
+            except ValueError:
+                raise ValueError(f"{name} must be a number")
+            if kind is str and not isinstance(value, str):
+                raise ValueError(f"{name} must be a string")
+        values[name] = value
+
+    if not partial:
+        missing = [name for name, column in columns.items()
+                   if not column.nullable and column.default is None and values.get(name) is None]
+        if missing:
+            raise ValueError(f"missing fields: {', '.join(missing)}")
+    return values
+
+
+def _error(index: int, message: str, id_: Optional[int] = None) -> Dict[str, Any]:
+    result = {'index': index, 'error': message}
+    if id_ is not None:
+        result['id'] = id_
+    return result
+
+
+def _store_ids() -> set:
+    return set(db.session.scalars(select(Store.id)))
+
+
+def _existing(model, ids: List[int]) -> Dict[int, Any]:
+    """Rows of ``model`` by id, loaded in chunks."""
+    rows = {}
+    for start in range(0, len(ids), _CHUNK):
+        chunk = ids[start:start + _CHUNK]
+        rows.update((row.id, row) for row in db.session.scalars(
+            select(model).where(model.id.in_(chunk))))
+    return rows
+
+
+def _apply(pending: List[Tuple[int, Dict[str, Any]]], results: List[Optional[Dict[str, Any]]],
+           apply: Callable[[Dict[str, Any]], Any]) -> None:
+    """
+    Run ``apply`` for every (index, values) pair and flush once. If the
+    flush fails, redo the items one savepoint each so only the failing
+    ones are dropped and reported.
+    """
+    if not pending:
+        return
+    try:
+        with db.session.begin_nested():
+            applied = [(index, apply(values)) for index, values in pending]
+    except SQLAlchemyError:
+        applied = []
+        for index, values in pending:
+            try:
+                with db.session.begin_nested():
+                    obj = apply(values)
+            except SQLAlchemyError as e:
+                results[index] = _error(index, str(getattr(e, 'orig', None) or e).splitlines()[0],
+                                        values.get('id'))
+                continue
+            applied.append((index, obj))
+    for index, obj in applied:
+        results[index] = {'index': index, 'id': obj.id}
+
+
+def _begin() -> None:
+    # The version bump opens the transaction, so every savepoint below is
+    # nested in it (pysqlite would otherwise commit on the first RELEASE)
+    bump_catalog_version()
+
+
+def _finish(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    failed = sum('error' in r for r in results)
+    if failed == len(results):
+        db.session.rollback()
+    else:
+        db.session.commit()
+        forget_catalog_state()
+    return {'succeeded': len(results) - failed, 'failed': failed, 'results': results}
+
+
+def bulk_create(model, items: List[Any]) -> Dict[str, Any]:
+    """Insert every valid item; returns per-item ids or errors."""
+    _begin()
+    store_ids = _store_ids() if model is Gift else None
+    results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+    pending = []
+    for index, item in enumerate(items):
+        try:
+            values = clean_fields(model, item)
+            if store_ids is not None and values['store_id'] not in store_ids:
+                raise ValueError(f"unknown store_id: {values['store_id']}")
+        except ValueError as e:
+            results[index] = _error(index, str(e))
+            continue
+        pending.append((index, values))
+
+    def create(values):
+        obj = model(**values)
+        db.session.add(obj)
+        return obj
+
+    _apply(pending, results, create)
+    return _finish(results)
+
+
+def bulk_update(model, items: List[Any]) -> Dict[str, Any]:
+    """Apply partial updates ({"id": ..., field: value, ...}) to existing rows."""
+    _begin()
+    results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+    parsed = []
+    for index, item in enumerate(items):
+        id_ = item.get('id') if isinstance(item, dict) else None
+        if not isinstance(id_, int) or isinstance(id_, bool):
+            results[index] = _error(index, "id is required")
+            continue
+        try:
+            values = clean_fields(model, {k: v for k, v in item.items() if k != 'id'}, partial=True)
+        except ValueError as e:
+            results[index] = _error(index, str(e), id_)
+            continue
+        parsed.append((index, id_, values))
+
+    rows = _existing(model, sorted({id_ for _, id_, _ in parsed}))
+    store_ids = (_store_ids() if model is Gift and any('store_id' in v for _, _, v in parsed)
+                 else None)
+    pending = []
+    for index, id_, values in parsed:
+        if id_ not in rows:
+            results[index] = _error(index, "not found", id_)
+        elif store_ids is not None and 'store_id' in values and values['store_id'] not in store_ids:
+            results[index] = _error(index, f"unknown store_id: {values['store_id']}", id_)
+        else:
+            pending.append((index, dict(values, id=id_)))
+
+    def update(values):
+        obj = rows[values['id']]
+        for name, value in values.items():
+            if name != 'id':
+                setattr(obj, name, value)
+        return obj
+
+    _apply(pending, results, update)
+    return _finish(results)
+
+
+def bulk_delete(model, ids: List[Any]) -> Dict[str, Any]:
+    """Delete rows by id (a store's gifts go with it)."""
+    _begin()
+    results: List[Optional[Dict[str, Any]]] = [None] * len(ids)
+    valid = {}
+    for index, id_ in enumerate(ids):
+        if not isinstance(id_, int) or isinstance(id_, bool):
+            results[index] = _error(index, "id must be an integer")
+        else:
+            valid[index] = id_
+
+    found = set()
+    unique = sorted(set(valid.values()))
+    for start in range(0, len(unique), _CHUNK):
+        chunk = unique[start:start + _CHUNK]
+        found.update(db.session.scalars(select(model.id).where(model.id.in_(chunk))))
+        if model is Store:
+            # Core deletes skip the ORM cascade, so remove the gifts explicitly
+            db.session.execute(delete(Gift).where(Gift.store_id.in_(chunk)),
+                               execution_options={'synchronize_session': False})
+        db.session.execute(delete(model).where(model.id.in_(chunk)),
+                           execution_options={'synchronize_session': False})
+
+    seen = set()
+    for index, id_ in valid.items():
+        if id_ not in found:
+            results[index] = _error(index, "not found", id_)
+        elif id_ in seen:
+            results[index] = _error(index, "duplicate id", id_)
+        else:
+            seen.add(id_)
+            results[index] = {'index': index, 'id': id_}
+    return _finish(results)
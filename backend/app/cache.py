@@ -0,0 +1,211 @@
+"""
+Recommendation result cache
+LRU + TTL cache of serialized /gifts/recommend responses, keyed on the
+normalized criteria and the catalog version (so any admin change to the
+catalog invalidates every entry). Backends:
+  - memory: per-process OrderedDict (default)
+  - sqlite: one SQLite file shared by all workers on the host
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from flask import current_app
+
+from .recommendation import normalize
+
+
+class MemoryCacheBackend:
+    """In-process LRU with per-entry expiry."""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCacheBackend:
+    """
+    Cache table in a local SQLite file, shared across gunicorn workers.
+    Entries store their expiry and last use time; the least recently used
+    rows are pruned when the table grows past max_entries.
+    """
+
+    def __init__(self, path: str, max_entries: int, ttl: float):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._local = threading.local()
+        self._writes = 0
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+                " expires REAL NOT NULL, used REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_cache_used ON cache (used)")
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread, never shared with a forked child
+        if getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return self._local.conn
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT value, expires FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] < now:
+                conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE cache SET used = ? WHERE key = ?", (now, key))
+        except sqlite3.OperationalError:
+            # Busy/locked: behave like a miss rather than failing the request
+            return None
+        return row[0]
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires, used) VALUES (?, ?, ?, ?)",
+                (key, value, now + self.ttl, now),
+            )
+            # Prune every max_entries/10 writes instead of on every write
+            self._writes += 1
+            if self._writes % max(1, self.max_entries // 10) == 0:
+                conn.execute(
+                    "DELETE FROM cache WHERE expires < ? OR key IN ("
+                    " SELECT key FROM cache ORDER BY used DESC LIMIT -1 OFFSET ?)",
+                    (now, self.max_entries),
+                )
+        except sqlite3.OperationalError:
+            pass
+
+    def clear(self) -> None:
+        self._connect().execute("DELETE FROM cache")
+
+    def __len__(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+
+class RecommendationCache:
+    """Keying and hit/miss accounting on top of a backend."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0}
+
+    @staticmethod
+    def key(criteria: Dict[str, Any], version: int, limit: int) -> Optional[str]:
+        """
+        Cache key for a criteria dict, or None when it should not be cached
+        (non-numeric age/budget or malformed interests).
+        """
+        age, budget = criteria.get('age'), criteria.get('budget')
+        for value in (age, budget):
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                return None
+        try:
+            interests = sorted(set(map(normalize, criteria.get('interests'))))
+            occasion = normalize(criteria.get('occasion'))
+            personality = normalize(criteria.get('personality_type'))
+        except (AttributeError, TypeError):
+            return None
+
+        # Only fields that influence scoring; numbers as floats so 25 and
+        # 25.0 share an entry.
+        normalized = {
+            'age': float(age),
+            'budget': float(budget),
+            'interests': interests,
+            'occasion': occasion,
+            'personality_type': personality,
+            'strict_interests': bool(criteria.get('strict_interests')),
+            'limit': limit,
+        }
+        raw = json.dumps(normalized, sort_keys=True, separators=(',', ':'))
+        return f"{version}:{hashlib.sha1(raw.encode('utf-8')).hexdigest()}"
+
+    def get(self, key: str) -> Optional[Tuple[int, str]]:
+        """Return (results_count, json_body) or None."""
+        value = self.backend.get(key)
+        with self._lock:
+            self._stats['hits' if value is not None else 'misses'] += 1
+        if value is None:
+            return None
+        count, _, body = value.partition('\n')
+        return int(count), body
+
+    def set(self, key: str, results_count: int, body: str) -> None:
+        self.backend.set(key, f"{results_count}\n{body}")
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats['backend'] = type(self.backend).__name__
+        stats['entries'] = len(self.backend)
+        return stats
+
+
+def init_cache(app) -> None:
+    """Attach the configured recommendation cache to the app (if any)."""
+    kind = app.config.get('RECOMMEND_CACHE_BACKEND', 'memory')
+    size = app.config['RECOMMEND_CACHE_SIZE']
+    ttl = app.config['RECOMMEND_CACHE_TTL']
+
+    if kind == 'memory':
+        backend = MemoryCacheBackend(size, ttl)
+    elif kind == 'sqlite':
+        backend = SQLiteCacheBackend(app.config['RECOMMEND_CACHE_PATH'], size, ttl)
+    elif kind in ('none', '', None):
+        return
+    else:
+        raise ValueError(f"Unknown RECOMMEND_CACHE_BACKEND: {kind}")
+
+    app.extensions['recommend_cache'] = RecommendationCache(backend)
+
+
+def get_cache() -> Optional[RecommendationCache]:
+    return current_app.extensions.get('recommend_cache')
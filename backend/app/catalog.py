@@ -0,0 +1,65 @@
+"""
+Catalog version tracking
+Every admin change to stores or gifts bumps a version stored in the
+database. Each worker caches it for CATALOG_VERSION_POLL_SECONDS, so
+process-local derived data (gift index, response caches) notices changes
+made by other workers within that window.
+"""
+import time
+from datetime import datetime
+from typing import Optional, Tuple
+
+from flask import current_app
+from sqlalchemy import select, update
+
+from .models import db, CatalogState
+
+
+def ensure_catalog_state() -> None:
+    """Create the version row if it does not exist yet."""
+    if db.session.get(CatalogState, 1) is None:
+        db.session.add(CatalogState(id=1, version=0, updated_at=datetime.utcnow()))
+        db.session.commit()
+
+
+def catalog_state() -> Tuple[int, Optional[datetime]]:
+    """Current (version, updated_at), re-read at most once per poll interval."""
+    cached = current_app.extensions.get('catalog_state')
+    now = time.monotonic()
+    if cached is not None and now - cached[2] < current_app.config['CATALOG_VERSION_POLL_SECONDS']:
+        return cached[0], cached[1]
+
+    row = db.session.execute(
+        select(CatalogState.version, CatalogState.updated_at).where(CatalogState.id == 1)
+    ).first()
+    version, updated_at = row if row is not None else (0, None)
+    current_app.extensions['catalog_state'] = (version, updated_at, now)
+    return version, updated_at
+
+
+def catalog_version() -> int:
+    return catalog_state()[0]
+
+
+def bump_catalog_version() -> None:
+    """Increment the version inside the current transaction."""
+    now = datetime.utcnow()
+    result = db.session.execute(
+        update(CatalogState)
+        .where(CatalogState.id == 1)
+        .values(version=CatalogState.version + 1, updated_at=now)
+    )
+    if not result.rowcount:
+        db.session.add(CatalogState(id=1, version=1, updated_at=now))
+
+
+def forget_catalog_state() -> None:
+    """Drop this worker's cached version so it sees its own change immediately."""
+    current_app.extensions.pop('catalog_state', None)
+
+
+def commit_catalog_change() -> None:
+    """Commit a store/gift change together with a version bump."""
+    bump_catalog_version()
+    db.session.commit()
+    forget_catalog_state()
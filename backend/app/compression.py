@@ -0,0 +1,140 @@
+"""
+Response compression
+Negotiates a content coding from Accept-Encoding and compresses JSON /
+text responses of at least COMPRESSION_MIN_SIZE bytes. gzip is always
+available; brotli ("br") and zstd are used when the brotli / zstandard
+packages are installed. Responses that already carry a Content-Encoding
+(e.g. precompressed snapshot listings) and streamed responses are left
+alone.
+"""
+import gzip
+import threading
+from typing import Callable, Dict, Optional
+
+from flask import current_app, request
+
+from .instrumentation import phase
+
+try:
+    import brotli
+except ImportError:  # optional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional
+    zstandard = None
+
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson', 'application/javascript')
+
+
+def _gzip(data: bytes, level: int) -> bytes:
+    return gzip.compress(data, min(max(level, 1), 9), mtime=0)
+
+
+def _brotli(data: bytes, level: int) -> bytes:
+    return brotli.compress(data, quality=min(max(level, 0), 11))
+
+
+def _zstd(data: bytes, level: int) -> bytes:
+    return zstandard.ZstdCompressor(level=min(max(level, 1), 22)).compress(data)
+
+
+# Content coding -> compressor(data, level); one level scale for all of
+# them, clamped to each codec's range (gzip 1-9, brotli 0-11, zstd 1-22)
+CODECS: Dict[str, Callable[[bytes, int], bytes]] = {'gzip': _gzip}
+if brotli is not None:
+    CODECS['br'] = _brotli
+if zstandard is not None:
+    CODECS['zstd'] = _zstd
+
+
+def compress(data: bytes, encoding: str, level: int) -> bytes:
+    return CODECS[encoding](data, level)
+
+
+def choose_encoding() -> Optional[str]:
+    """
+    The content coding to use for the current request: the client's
+    highest-q coding among COMPRESSION_ENCODINGS (server order breaks ties),
+    or None for identity.
+    """
+    accept = request.accept_encodings
+    best, best_q = None, 0
+    for encoding in current_app.config['COMPRESSION_ENCODINGS']:
+        if encoding not in CODECS:
+            continue
+        q = accept[encoding]
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class Precompressed:
+    """A response body plus its encoded variants, each built on first use."""
+
+    def __init__(self, data: bytes, level: int):
+        self.data = data
+        self.level = level
+        self._variants: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def variant(self, encoding: str) -> bytes:
+        encoded = self._variants.get(encoding)
+        if encoded is None:
+            with self._lock:
+                encoded = self._variants.get(encoding)
+                if encoded is None:
+                    encoded = self._variants[encoding] = compress(self.data, encoding, self.level)
+        return encoded
+
+
+def variant_etag(etag: str, encoding: Optional[str]) -> str:
+    """
+    ETag of one content coding of a representation: a strong ETag names
+    exactly one representation, so each encoding gets its own tag.
+    """
+    return f"{etag}-{encoding}" if encoding else etag
+
+
+def _compressible(response) -> bool:
+    if response.status_code != 200 or response.direct_passthrough or response.is_streamed:
+        return False
+    if 'Content-Encoding' in response.headers:
+        return False
+    if 'no-transform' in response.headers.get('Cache-Control', ''):
+        return False
+    mimetype = response.mimetype or ''
+    return mimetype.startswith('text/') or mimetype in COMPRESSIBLE_TYPES
+
+
+def encode_response(response, data: bytes, encoding: str):
+    """Set an encoded body (and the matching headers) on a response."""
+    response.set_data(data)
+    response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(variant_etag(etag, encoding), weak)
+    return response
+
+
+def _compress_response(response):
+    if not _compressible(response):
+        return response
+    data = response.get_data()
+    if len(data) < current_app.config['COMPRESSION_MIN_SIZE']:
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = choose_encoding()
+    if encoding is None:
+        return response
+    with phase('compress'):
+        encoded = compress(data, encoding, current_app.config['COMPRESSION_LEVEL'])
+    return encode_response(response, encoded, encoding)
+
+
+def init_compression(app) -> None:
+    """Compress eligible responses when COMPRESSION_ENABLED is set."""
+    if app.config.get('COMPRESSION_ENABLED'):
+        app.after_request(_compress_response)
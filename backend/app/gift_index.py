@@ -0,0 +1,208 @@
+"""
+In-memory gift index for the recommendation engine
+Process-local, array-backed copy of the gift fields used for scoring
+"""
+import logging
+import numbers
+import threading
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+from flask import current_app
+
+from .catalog import catalog_version
+from .models import db, Gift
+from .recommendation import CompatibilityMatrix, normalize, occasion_rule, personality_rule
+
+logger = logging.getLogger(__name__)
+
+
+def _number(value) -> float:
+    if not isinstance(value, numbers.Real):
+        raise TypeError(f"expected a number, got {type(value).__name__}")
+    return float(value)
+
+
+def _parse_row(row: Tuple) -> Tuple:
+    """
+    Scoring fields of one (COLUMNS) row, normalized. Raises where
+    smart_score would fail on the same gift (non-numeric ages or budgets,
+    non-text occasion / personality, interests that are not a list of text).
+    """
+    (gift_id, min_age, max_age, min_budget, max_budget,
+     gender, occasion, personality, interests) = row
+    return (gift_id, _number(min_age), _number(max_age), _number(min_budget), _number(max_budget),
+            normalize(gender if isinstance(gender, str) else None),  # not scored
+            normalize(occasion), normalize(personality),
+            tuple(normalize(name) for name in interests or []))
+
+
+class Vocabulary:
+    """Interns normalized strings into dense integer codes."""
+
+    def __init__(self):
+        self.values: List[str] = []
+        self.codes: Dict[str, int] = {}
+
+    def intern(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class IndexedGift:
+    """Lightweight read-only view of one indexed gift (no ORM state)."""
+
+    __slots__ = ('id', 'min_age', 'max_age', 'min_budget', 'max_budget',
+                 'gender', 'occasion', 'personality_type', 'interests')
+
+    def __init__(self, **fields):
+        for name, value in fields.items():
+            setattr(self, name, value)
+
+
+class GiftIndex:
+    """
+    Columnar gift catalog.
+
+    Row ``i`` of every array describes the same gift; rows are ordered by
+    gift id. Categorical fields are stored as codes into a ``Vocabulary``.
+    Interests are stored twice: as a bitset of shape ``(n, words)`` over the
+    interest vocabulary (overlap counts become popcounts) and as an inverted
+    index ``postings[code] -> sorted rows`` for fetching only the gifts that
+    share an interest. Personality and occasion rules are precomputed into
+    ``CompatibilityMatrix`` tables over their vocabularies.
+
+    Rows the scalar scorer could not score either (see ``_parse_row``) are
+    left out and their ids kept in ``skipped``, so one malformed gift does
+    not take every recommendation down with it.
+    """
+
+    COLUMNS = (Gift.id, Gift.min_age, Gift.max_age, Gift.min_budget,
+               Gift.max_budget, Gift.gender, Gift.occasion,
+               Gift.personality_type, Gift.interests)
+
+    def __init__(self, rows: Sequence[Tuple], version: int = 0):
+        self.version = version
+        self.genders = Vocabulary()
+        self.occasions = Vocabulary()
+        self.personalities = Vocabulary()
+        self.interest_vocab = Vocabulary()
+
+        parsed = []
+        self.skipped: List[int] = []
+        for row in rows:
+            try:
+                parsed.append(_parse_row(row))
+            except (TypeError, ValueError, AttributeError):
+                self.skipped.append(row[0])
+        if self.skipped:
+            logger.warning("Gift index: skipped %d malformed gifts (ids %s)", len(self.skipped),
+                           ', '.join(map(str, self.skipped[:20])))
+
+        n = len(parsed)
+        self.ids = np.empty(n, dtype=np.int64)
+        self.min_age = np.empty(n, dtype=np.float64)
+        self.max_age = np.empty(n, dtype=np.float64)
+        self.min_budget = np.empty(n, dtype=np.float64)
+        self.max_budget = np.empty(n, dtype=np.float64)
+        self.gender_codes = np.empty(n, dtype=np.int32)
+        self.occasion_codes = np.empty(n, dtype=np.int32)
+        self.personality_codes = np.empty(n, dtype=np.int32)
+
+        # Normalized interests in their original order, interned through the
+        # vocabulary so equal strings share one object.
+        self.interests: List[Tuple[str, ...]] = []
+        interest_codes: List[List[int]] = []
+
+        for i, (gift_id, min_age, max_age, min_budget, max_budget,
+                gender, occasion, personality, names) in enumerate(parsed):
+            self.ids[i] = gift_id
+            self.min_age[i] = min_age
+            self.max_age[i] = max_age
+            self.min_budget[i] = min_budget
+            self.max_budget[i] = max_budget
+            self.gender_codes[i] = self.genders.intern(gender)
+            self.occasion_codes[i] = self.occasions.intern(occasion)
+            self.personality_codes[i] = self.personalities.intern(personality)
+
+            codes = [self.interest_vocab.intern(name) for name in names]
+            self.interests.append(tuple(self.interest_vocab.values[c] for c in codes))
+            interest_codes.append(codes)
+
+        self.personality_matrix = CompatibilityMatrix(personality_rule, self.personalities.values)
+        self.occasion_matrix = CompatibilityMatrix(occasion_rule, self.occasions.values)
+
+        self.words = max(1, (len(self.interest_vocab) + 63) // 64)
+        self.interest_bits = np.zeros((n, self.words), dtype=np.uint64)
+        postings: List[List[int]] = [[] for _ in range(len(self.interest_vocab))]
+        for i, codes in enumerate(interest_codes):
+            for code in codes:
+                self.interest_bits[i, code >> 6] |= np.uint64(1 << (code & 63))
+                postings[code].append(i)
+        # np.unique sorts and drops repeats from gifts listing an interest twice
+        self.postings = [np.unique(np.array(rows, dtype=np.int64)) for rows in postings]
+
+    @classmethod
+    def load(cls) -> 'GiftIndex':
+        """Build the index from the database using plain column tuples."""
+        version = catalog_version()
+        rows = db.session.query(*cls.COLUMNS).order_by(Gift.id).all()
+        return cls(rows, version)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def gift(self, i: int) -> IndexedGift:
+        return IndexedGift(
+            id=int(self.ids[i]),
+            min_age=self.min_age[i].item(),
+            max_age=self.max_age[i].item(),
+            min_budget=self.min_budget[i].item(),
+            max_budget=self.max_budget[i].item(),
+            gender=self.genders.values[self.gender_codes[i]],
+            occasion=self.occasions.values[self.occasion_codes[i]],
+            personality_type=self.personalities.values[self.personality_codes[i]],
+            interests=list(self.interests[i]),
+        )
+
+    def gifts(self):
+        """Iterate over lightweight views of every indexed gift."""
+        return (self.gift(i) for i in range(len(self)))
+
+
+# ================== PROCESS-LOCAL INSTANCE ==================
+# One index per application per worker process, kept in app.extensions and
+# rebuilt whenever the catalog version moves (see catalog.py).
+_lock = threading.Lock()
+
+
+def get_gift_index() -> GiftIndex:
+    """Return the current index, building it on first use or after a catalog change."""
+    version = catalog_version()
+    index = current_app.extensions.get('gift_index')
+    if index is None or index.version != version:
+        with _lock:
+            index = current_app.extensions.get('gift_index')
+            if index is None or index.version != version:
+                index = GiftIndex.load()
+                current_app.extensions['gift_index'] = index
+    return index
+
+
+def invalidate_gift_index() -> None:
+    """Drop the index so the next recommendation rebuilds it from the database."""
+    with _lock:
+        current_app.extensions.pop('gift_index', None)
+
+
+def refresh_gift_index() -> GiftIndex:
+    """Rebuild the index now (used at startup and after catalog changes)."""
+    invalidate_gift_index()
+    return get_gift_index()
@@ -0,0 +1,199 @@
+"""
+Recommendation history writer
+Buffers history rows in a bounded in-process queue and bulk-inserts them
+from a background thread, so /gifts/recommend does not pay for a commit
+"""
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List
+
+from flask import current_app
+from sqlalchemy import insert
+
+from .models import db, Recommendation
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class HistoryWriter:
+    """Background bulk writer for Recommendation rows."""
+
+    def __init__(self, app, max_queue: int, flush_rows: int, flush_interval_ms: int):
+        self.app = app
+        self.max_queue = max_queue
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval_ms / 1000
+        self._lock = threading.Lock()
+        self._pid = None
+        self._thread = None
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._stats = {'queued': 0, 'written': 0, 'dropped': 0, 'failed': 0, 'flushes': 0}
+        atexit.register(self.close)
+
+    def submit(self, record: Dict[str, Any]) -> bool:
+        """Queue one row; returns False (and counts a drop) when the queue is full."""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self._count('dropped')
+            return False
+        self._count('queued')
+        return True
+
+    def submit_many(self, records: List[Dict[str, Any]]) -> int:
+        """Queue several rows; returns how many were accepted."""
+        return sum(self.submit(record) for record in records)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats['pending'] = self._queue.qsize()
+        stats['capacity'] = self.max_queue
+        stats['running'] = bool(self._thread and self._thread.is_alive())
+        return stats
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Flush everything still queued and stop the thread (called at exit)."""
+        thread = self._thread
+        if thread is None or self._pid != os.getpid() or not thread.is_alive():
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            logger.warning("History queue still full at shutdown; some rows may be lost")
+            return
+        thread.join(timeout)
+
+    # ---------------- internals ----------------
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._stats[name] += amount
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            # First use in this process (or after a fork): threads and
+            # queued items do not survive fork, so start from scratch.
+            self._queue = queue.Queue(maxsize=self.max_queue)
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='history-writer', daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.flush_rows:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._flush(batch)
+
+        # Drain whatever arrived before the stop marker was processed
+        rest = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                rest.append(item)
+        for start in range(0, len(rest), self.flush_rows):
+            self._flush(rest[start:start + self.flush_rows])
+
+    def _flush(self, batch: List[Dict[str, Any]]) -> None:
+        with self.app.app_context():
+            try:
+                db.session.execute(insert(Recommendation), batch)
+                db.session.commit()
+                self._count('written', len(batch))
+                self._count('flushes')
+            except Exception:
+                db.session.rollback()
+                if len(batch) == 1:
+                    self._count('failed')
+                    logger.exception("Failed to write a recommendation history row")
+                else:
+                    # Retry row by row so one bad row does not take the rest down
+                    logger.warning("History batch of %d rows failed; retrying row by row", len(batch))
+                    for record in batch:
+                        self._flush_one(record)
+            finally:
+                db.session.remove()
+
+    def _flush_one(self, record: Dict[str, Any]) -> None:
+        try:
+            db.session.execute(insert(Recommendation), [record])
+            db.session.commit()
+            self._count('written')
+        except Exception:
+            db.session.rollback()
+            self._count('failed')
+            logger.exception("Failed to write a recommendation history row")
+
+
+def init_history(app) -> None:
+    """Attach a HistoryWriter to the app when HISTORY_ASYNC is enabled."""
+    if app.config.get('HISTORY_ASYNC'):
+        app.extensions['history_writer'] = HistoryWriter(
+            app,
+            max_queue=app.config['HISTORY_QUEUE_SIZE'],
+            flush_rows=app.config['HISTORY_FLUSH_ROWS'],
+            flush_interval_ms=app.config['HISTORY_FLUSH_INTERVAL_MS'],
+        )
+
+
+def history_record(criteria: Dict[str, Any], results_count: int) -> Dict[str, Any]:
+    """Column values of one Recommendation row."""
+    return {
+        'age': criteria['age'],
+        'budget': criteria['budget'],
+        'gender': criteria.get('gender'),
+        'occasion': criteria.get('occasion'),
+        'personality_type': criteria.get('personality_type'),
+        'relationship': criteria.get('relationship'),
+        'interests': criteria['interests'],
+        'results_count': results_count,
+        'created_at': datetime.utcnow(),
+    }
+
+
+def record_history(records: List[Dict[str, Any]]) -> None:
+    """Queue history rows, or write them right away when no writer is running."""
+    writer = current_app.extensions.get('history_writer')
+    if writer is not None:
+        writer.submit_many(records)
+        return
+
+    db.session.add_all(Recommendation(**record) for record in records)
+    db.session.commit()
+
+
+def history_metrics() -> Dict[str, Any]:
+    writer = current_app.extensions.get('history_writer')
+    return writer.metrics() if writer is not None else {'mode': 'sync'}
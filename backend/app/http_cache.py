@@ -0,0 +1,96 @@
+"""
+HTTP conditional caching for public catalog reads
+Catalog responses only change when an admin write bumps the catalog
+version, so their ETag is derived from that version and the request URL
+alone (plus the content coding when the response is compressed). A
+matching If-None-Match (or If-Modified-Since) is answered with 304 before
+the view runs: no query, no serialization. Only If-None-Match: * waits for
+the view, since it must not confirm a resource that does not exist.
+Cache-Control comes from Config so browsers and the reverse proxy can
+reuse responses.
+"""
+import hashlib
+from datetime import timezone
+from functools import wraps
+
+from flask import current_app, request
+
+from .catalog import catalog_state
+from .compression import choose_encoding, variant_etag
+
+
+def acceptable_etags(etag: str):
+    """
+    The tags this request may revalidate with: the identity representation
+    and the one in the content coding it negotiates (a 304 must not confirm
+    a variant the client cannot decode).
+    """
+    tags = [etag]
+    if current_app.config["COMPRESSION_ENABLED"]:
+        encoding = choose_encoding()
+        if encoding:
+            tags.append(variant_etag(etag, encoding))
+    return tags
+
+
+def matching_etag(etag: str):
+    """The If-None-Match tag naming one of acceptable_etags(etag), or None."""
+    if_none_match = request.if_none_match
+    for tag in acceptable_etags(etag):
+        if if_none_match.contains_weak(tag):
+            return tag
+    return None
+
+
+def catalog_etag(version: int) -> str:
+    """Strong ETag of the current URL at a catalog version."""
+    digest = hashlib.blake2b(request.full_path.encode("utf-8"), digest_size=8).hexdigest()
+    return f"c{version}-{digest}"
+
+
+def conditional(policy: str = "CACHE_CONTROL_CATALOG"):
+    """
+    Serve a catalog read with ETag / Last-Modified / Cache-Control (the
+    Config key ``policy``) and answer revalidations with 304.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            if not current_app.config["CONDITIONAL_GET"]:
+                return f(*args, **kwargs)
+
+            version, updated_at = catalog_state()
+            etag = catalog_etag(version)
+            last_modified = (updated_at.replace(microsecond=0, tzinfo=timezone.utc)
+                             if updated_at else None)
+
+            matched = None
+            if request.if_none_match:
+                # "*" only matches a resource that exists, so it is decided
+                # after the view ran
+                matched = None if request.if_none_match.star_tag else matching_etag(etag)
+                not_modified = matched is not None
+            else:
+                since = request.if_modified_since
+                not_modified = bool(since and last_modified and last_modified <= since)
+
+            if not_modified:
+                response = current_app.response_class(status=304)
+                etag = matched or etag
+            else:
+                response = current_app.make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                etag = variant_etag(etag, response.content_encoding)
+                if request.if_none_match.star_tag:
+                    response = current_app.response_class(status=304)
+
+            response.set_etag(etag)
+            if last_modified:
+                response.last_modified = last_modified
+            cache_control = current_app.config[policy]
+            if cache_control:
+                response.headers["Cache-Control"] = cache_control
+            return response
+        return decorated
+    return decorator
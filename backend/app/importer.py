@@ -0,0 +1,220 @@
+"""
+Bulk catalog import
+Streams stores or gifts from CSV / NDJSON, skips rows whose natural key is
+already in the catalog (one prefetched key set instead of a query per row)
+and inserts the rest with executemany batches inside the caller's
+transaction.
+
+Natural keys: stores by ``name_en``, gifts by ``(store_id, name_en)``.
+"""
+import csv
+import json
+import math
+from datetime import datetime
+from typing import Any, Dict, IO, Iterable, Iterator, List, Optional, Tuple
+
+from flask import current_app
+
+from .catalog import commit_catalog_change
+from .models import db, Store, Gift
+from .recommendation import normalize_interests
+
+# Errors kept in the result; the rest are only counted
+MAX_REPORTED_ERRORS = 100
+
+_INT_FIELDS = {'store_id', 'min_age', 'max_age'}
+_FLOAT_FIELDS = {'min_budget', 'max_budget'}
+_TEXT_FIELDS = {
+    Store: ('name_ar', 'name_en', 'location_url', 'description_ar', 'description_en', 'image_url'),
+    Gift: ('name_ar', 'name_en', 'category', 'gender', 'occasion', 'personality_type',
+           'image_url', 'description_ar', 'description_en'),
+}
+_REQUIRED = {
+    Store: ('name_ar', 'name_en', 'location_url'),
+    Gift: ('store_id', 'name_ar', 'name_en', 'category', 'min_age', 'max_age',
+           'min_budget', 'max_budget', 'interests'),
+}
+
+
+def read_records(stream: IO[str], fmt: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Yield (line number, raw record) pairs from a CSV or NDJSON text stream."""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+    elif fmt == 'ndjson':
+        for line_num, line in enumerate(stream, start=1):
+            if line.strip():
+                try:
+                    yield line_num, json.loads(line)
+                except json.JSONDecodeError:
+                    yield line_num, None  # reported as an invalid row
+    else:
+        raise ValueError(f"Unknown import format: {fmt}")
+
+
+def _parse_interests(value: Any) -> List[str]:
+    if isinstance(value, str):
+        value = value.strip()
+        # CSV cells hold a JSON list or a '|' / ',' separated string
+        if value.startswith('['):
+            value = json.loads(value)
+        else:
+            value = value.replace('|', ',').split(',')
+    if not isinstance(value, list):
+        raise ValueError("interests must be a list")
+    return normalize_interests(value)
+
+
+def _number(name: str, value: Any) -> float:
+    """A finite float from a JSON number or CSV cell (raises ValueError)."""
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        raise ValueError(f"{name} must be a number")
+    try:
+        number = float(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a number")
+    if not math.isfinite(number):
+        raise ValueError(f"{name} must be a finite number")
+    return number
+
+
+def _whole_number(name: str, value: Any) -> int:
+    """An int from a JSON number or CSV cell; 12.0 is accepted, 12.7 is not."""
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.strip().lstrip('+-').isdigit():
+        return int(value)
+    number = _number(name, value)
+    if not number.is_integer():
+        raise ValueError(f"{name} must be a whole number")
+    return int(number)
+
+
+def _clean(model, record: Dict[str, Any], stores_by_name: Dict[str, int],
+           imported_at: datetime) -> Dict[str, Any]:
+    """
+    Column values of one import row (raises ValueError when invalid). Every
+    row gets the same keys so executemany batches are not split up.
+    """
+    values = {}
+    for name in _TEXT_FIELDS[model]:
+        value = record.get(name)
+        values[name] = None if value in (None, '') else str(value)
+
+    if model is Gift:
+        for name in (_INT_FIELDS | _FLOAT_FIELDS) - {'store_id'}:
+            if record.get(name) not in (None, ''):
+                values[name] = record[name]
+        column = 'store_id' if record.get('store_id') not in (None, '') else 'store'
+        store = record.get(column)
+        if isinstance(store, dict):  # as exported by /admin/gifts
+            store = store.get('id')
+        if isinstance(store, str) and not store.strip().isdigit():
+            name = store.strip()
+            store = stores_by_name.get(name)
+            if store is None:
+                raise ValueError(f"unknown store in {column}: {name}")
+        if store not in (None, ''):
+            values['store_id'] = store
+        if record.get('interests') not in (None, ''):
+            values['interests'] = _parse_interests(record['interests'])
+
+    missing = [name for name in _REQUIRED[model] if values.get(name) is None]
+    if missing:
+        raise ValueError(f"missing fields: {', '.join(missing)}")
+
+    for name in _INT_FIELDS & values.keys():
+        values[name] = _whole_number(name, values[name])
+    for name in _FLOAT_FIELDS & values.keys():
+        values[name] = _number(name, values[name])
+
+    created_at = record.get('created_at') or imported_at
+    values['created_at'] = (created_at if isinstance(created_at, datetime)
+                            else datetime.fromisoformat(str(created_at)))
+    return values
+
+
+def _natural_key(model, values: Dict[str, Any]):
+    return values['name_en'] if model is Store else (values['store_id'], values['name_en'])
+
+
+def import_records(model, records: Iterable[Tuple[int, Dict[str, Any]]],
+                   batch_size: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Insert (line number, record) pairs for Store or Gift. Rows already in
+    the catalog (or earlier in the same import) are skipped, invalid rows
+    are reported and skipped. Nothing is committed: the caller decides
+    (commit_catalog_change() to publish, rollback to discard).
+    """
+    batch_size = batch_size or current_app.config['IMPORT_BATCH_SIZE']
+
+    # One round trip each for the natural keys and the store references
+    if model is Store:
+        existing = {name for (name,) in db.session.query(Store.name_en)}
+        stores_by_name: Dict[str, int] = {}
+        store_ids = set()
+    else:
+        existing = set(db.session.query(Gift.store_id, Gift.name_en))
+        stores_by_name = {name: id_ for id_, name in db.session.query(Store.id, Store.name_en)}
+        store_ids = set(stores_by_name.values())
+
+    imported_at = datetime.utcnow()
+    result = {'inserted': 0, 'skipped': 0, 'invalid': 0, 'errors': []}
+    batch: List[Dict[str, Any]] = []
+
+    def flush():
+        if batch:
+            # Core executemany on the session's connection: no ORM bookkeeping
+            db.session.connection().execute(model.__table__.insert(), batch)
+            result['inserted'] += len(batch)
+            batch.clear()
+
+    for line, record in records:
+        try:
+            if not isinstance(record, dict):
+                raise ValueError("expected a JSON object")
+            values = _clean(model, record, stores_by_name, imported_at)
+            if model is Gift and values['store_id'] not in store_ids:
+                raise ValueError(f"unknown store_id: {values['store_id']}")
+        except (ValueError, TypeError) as e:
+            result['invalid'] += 1
+            if len(result['errors']) < MAX_REPORTED_ERRORS:
+                result['errors'].append({'line': line, 'error': str(e)})
+            continue
+
+        key = _natural_key(model, values)
+        if key in existing:
+            result['skipped'] += 1
+            continue
+        existing.add(key)
+        batch.append(values)
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+    return result
+
+
+def import_stream(model, stream: IO[str], fmt: str, batch_size: Optional[int] = None) -> Dict[str, Any]:
+    """Import one CSV / NDJSON stream in a single transaction and publish it."""
+    try:
+        result = import_records(model, read_records(stream, fmt), batch_size)
+    except Exception:
+        db.session.rollback()
+        raise
+    if result['inserted']:
+        commit_catalog_change()
+    else:
+        db.session.rollback()
+    return result
+
+
+def detect_format(filename: Optional[str], content_type: Optional[str] = None) -> Optional[str]:
+    """csv / ndjson from a file extension or content type, or None."""
+    name = (filename or '').lower()
+    mimetype = (content_type or '').split(';')[0].strip().lower()
+    if name.endswith('.csv') or mimetype == 'text/csv':
+        return 'csv'
+    if name.endswith(('.ndjson', '.jsonl')) or mimetype in ('application/x-ndjson', 'application/jsonl'):
+        return 'ndjson'
+    return None
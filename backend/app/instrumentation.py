@@ -0,0 +1,157 @@
+"""
+Request instrumentation
+Per-request phase timings and SQL statement counts, reported in a
+Server-Timing header and kept as rolling latency percentiles per endpoint
+(see /admin/metrics). Cheap enough to leave on: a few perf_counter() calls
+per request and one deque append per recorded value.
+"""
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, List
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class RequestMetrics:
+    """Rolling windows of the last ``window`` samples per endpoint."""
+
+    def __init__(self, window: int):
+        self.window = window
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, endpoint: str, total_ms: float, sql: int, phases: Dict[str, float]) -> None:
+        with self._lock:
+            entry = self._endpoints.get(endpoint)
+            if entry is None:
+                entry = self._endpoints[endpoint] = {
+                    'count': 0,
+                    'total': deque(maxlen=self.window),
+                    'sql': deque(maxlen=self.window),
+                    'phases': {},
+                }
+            entry['count'] += 1
+            entry['total'].append(total_ms)
+            entry['sql'].append(sql)
+            for name, ms in phases.items():
+                samples = entry['phases'].get(name)
+                if samples is None:
+                    samples = entry['phases'][name] = deque(maxlen=self.window)
+                samples.append(ms)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Request count and p50/p95/p99 (ms) of every endpoint and phase."""
+        with self._lock:
+            copies = {
+                endpoint: (entry['count'], list(entry['total']), list(entry['sql']),
+                           {name: list(samples) for name, samples in entry['phases'].items()})
+                for endpoint, entry in self._endpoints.items()
+            }
+        return {
+            endpoint: {
+                'count': count,
+                'window': len(total),
+                'latency_ms': percentiles(total),
+                'sql_statements': percentiles(sql),
+                'phases_ms': {name: percentiles(samples) for name, samples in phases.items()},
+            }
+            for endpoint, (count, total, sql, phases) in copies.items()
+        }
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """Nearest-rank p50/p95/p99 of a sample list."""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+    last = len(ordered) - 1
+    return {
+        name: round(ordered[min(last, int(q * len(ordered)))], 3)
+        for name, q in (('p50', 0.50), ('p95', 0.95), ('p99', 0.99))
+    }
+
+
+@contextmanager
+def phase(name: str):
+    """Time a block as one named phase of the current request (no-op outside requests)."""
+    phases = g.get('phases') if has_request_context() else None
+    if phases is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        phases[name] = phases.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+
+# ================== SQL COUNTING ==================
+# Statements executed while handling a request are counted and their time
+# is reported as the "db" phase. Background threads (history writer) have
+# no request context and are not counted.
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and 'phases' in g:
+        conn.info['query_start'] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = conn.info.pop('query_start', None)
+    if start is not None and has_request_context() and 'phases' in g:
+        g.sql_count += 1
+        g.phases['db'] = g.phases.get('db', 0.0) + (time.perf_counter() - start) * 1000
+
+
+_listening = False
+
+
+def _listen_for_sql() -> None:
+    global _listening
+    if not _listening:
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        _listening = True
+
+
+# ================== FLASK HOOKS ==================
+def _start_request() -> None:
+    g.request_start = time.perf_counter()
+    g.phases = {}
+    g.sql_count = 0
+
+
+def _finish_request(response):
+    start = g.get('request_start')
+    if start is None:
+        return response
+    total_ms = (time.perf_counter() - start) * 1000
+    phases = g.phases
+
+    if current_app.config['SERVER_TIMING']:
+        entries = [f"{name};dur={ms:.2f}" for name, ms in phases.items()]
+        entries.append(f'sql;desc="{g.sql_count} statements"')
+        entries.append(f"total;dur={total_ms:.2f}")
+        response.headers.add('Server-Timing', ', '.join(entries))
+
+    metrics = current_app.extensions.get('request_metrics')
+    if metrics is not None:
+        metrics.record(request.endpoint or 'unmatched', total_ms, g.sql_count, phases)
+    return response
+
+
+def init_instrumentation(app) -> None:
+    """Register the timing hooks when METRICS_ENABLED is set."""
+    if not app.config.get('METRICS_ENABLED'):
+        return
+    _listen_for_sql()
+    app.extensions['request_metrics'] = RequestMetrics(app.config['METRICS_WINDOW'])
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+
+
+def request_metrics() -> Dict[str, Any]:
+    metrics = current_app.extensions.get('request_metrics')
+    return metrics.snapshot() if metrics is not None else {}
@@ -0,0 +1,130 @@
+"""
+Fast JSON provider
+Replaces Flask's stdlib-json provider (app.json, used by jsonify,
+request.get_json and the pre-serialized bodies) with orjson or ujson when
+importable, falling back to the stdlib. JSON_ENCODER picks one explicitly
+('orjson', 'ujson', 'json') or the first available ('auto').
+
+Every backend produces the same bytes: compact separators, sorted keys,
+UTF-8 text (no \\uXXXX escapes) and ISO 8601 datetimes, so models hand
+datetime values over as they are instead of calling isoformat() themselves.
+"""
+import dataclasses
+import decimal
+import json
+import uuid
+from datetime import date, time
+from typing import Any, Callable, Dict
+
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional
+    orjson = None
+
+try:
+    import ujson
+except ImportError:  # optional
+    ujson = None
+
+try:
+    import numpy
+except ImportError:  # optional
+    numpy = None
+
+
+def _default(o: Any) -> Any:
+    """Types the encoders do not handle natively (orjson covers most itself)."""
+    if isinstance(o, (date, time)):
+        return o.isoformat()
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, "__html__"):
+        return str(o.__html__())
+    if numpy is not None and isinstance(o, numpy.generic):
+        return o.item()
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+# ---------------- backends: obj -> bytes, (str | bytes) -> obj ----------------
+def _orjson_dumps(sort_keys: bool) -> Callable[[Any], bytes]:
+    option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    if sort_keys:
+        option |= orjson.OPT_SORT_KEYS
+    return lambda obj: orjson.dumps(obj, default=_default, option=option)
+
+
+def _ujson_dumps(sort_keys: bool) -> Callable[[Any], bytes]:
+    return lambda obj: ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False,
+                                   sort_keys=sort_keys, default=_default).encode()
+
+
+def _stdlib_dumps(sort_keys: bool) -> Callable[[Any], bytes]:
+    encoder = json.JSONEncoder(ensure_ascii=False, sort_keys=sort_keys,
+                               separators=(",", ":"), default=_default)
+    return lambda obj: encoder.encode(obj).encode()
+
+
+BACKENDS: Dict[str, tuple] = {'json': (_stdlib_dumps, json.loads)}
+if ujson is not None:
+    BACKENDS['ujson'] = (_ujson_dumps, ujson.loads)
+if orjson is not None:
+    BACKENDS['orjson'] = (_orjson_dumps, orjson.loads)
+
+# Preference order for JSON_ENCODER=auto
+PREFERENCE = ('orjson', 'ujson', 'json')
+
+
+def resolve_backend(name: str) -> str:
+    """The backend for a JSON_ENCODER value; ValueError when unavailable."""
+    if name == 'auto':
+        return next(backend for backend in PREFERENCE if backend in BACKENDS)
+    if name not in BACKENDS:
+        raise ValueError(f"JSON_ENCODER={name!r} is not available "
+                         f"(installed: {', '.join(sorted(BACKENDS))})")
+    return name
+
+
+class FastJSONProvider(JSONProvider):
+    """
+    app.json on top of the chosen backend. Calls with extra json.dumps /
+    json.loads arguments (indent=..., cls=...) go through the stdlib, as
+    do debug-mode responses, which are indented like Flask's own.
+    """
+
+    sort_keys = True
+    mimetype = "application/json"
+
+    def __init__(self, app, backend: str = 'auto'):
+        super().__init__(app)
+        self.backend = resolve_backend(backend)
+        make_dumps, self._loads = BACKENDS[self.backend]
+        self.dumpb: Callable[[Any], bytes] = make_dumps(self.sort_keys)
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if kwargs:
+            kwargs.setdefault("default", _default)
+            kwargs.setdefault("ensure_ascii", False)
+            kwargs.setdefault("sort_keys", self.sort_keys)
+            return json.dumps(obj, **kwargs)
+        return self.dumpb(obj).decode()
+
+    def loads(self, s, **kwargs: Any) -> Any:
+        if kwargs:
+            return json.loads(s, **kwargs)
+        return self._loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        if self._app.debug:
+            body = self.dumps(obj, indent=2).encode()
+        else:
+            body = self.dumpb(obj)
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
+
+
+def init_json(app) -> None:
+    app.json = FastJSONProvider(app, app.config['JSON_ENCODER'])
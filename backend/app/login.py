@@ -0,0 +1,148 @@
+"""
+Admin login guard
+Password hashes are deliberately slow (~150 ms of CPU for werkzeug's
+default scrypt). To keep a burst of login attempts from starving public
+traffic on the same worker, /admin/login:
+  - rate limits attempts per username (sliding window, checked before any
+    hashing happens),
+  - verifies passwords on a small bounded thread pool (hashlib's scrypt and
+    pbkdf2 release the GIL) and answers 503 at once when it is saturated;
+    on Linux the pool threads also run at a lower CPU priority
+    (LOGIN_WORKER_NICE), so request threads win a contended core,
+  - re-hashes the stored password with PASSWORD_HASH_METHOD after a
+    successful login when it was made with other parameters.
+Limits are per process: with N gunicorn workers a username gets up to N
+times LOGIN_RATE_LIMIT attempts per window.
+"""
+import atexit
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from flask import current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+
+# Usernames tracked by the rate limiter (least recently used are dropped)
+MAX_TRACKED_USERNAMES = 10_000
+
+
+class LoginBusy(Exception):
+    """Every verification slot is taken."""
+
+
+@lru_cache(maxsize=8)
+def hash_prefix(method: str) -> str:
+    """Stored-hash prefix for a method, e.g. 'scrypt' -> 'scrypt:32768:8:1'."""
+    return generate_password_hash('', method).split('$', 1)[0]
+
+
+def verify_password(password_hash: str, password: str, method: str) -> Tuple[bool, Optional[str]]:
+    """(matches, upgraded hash or None) for one stored hash."""
+    if not check_password_hash(password_hash, password):
+        return False, None
+    if password_hash.split('$', 1)[0] != hash_prefix(method):
+        return True, generate_password_hash(password, method)
+    return True, None
+
+
+class LoginGuard:
+    """Per-username rate limiter plus a bounded pool for password checks."""
+
+    def __init__(self, workers: int, queue: int, attempts: int, window: float, timeout: float,
+                 nice: int = 0):
+        self.workers = workers
+        self.nice = nice
+        self.attempts = attempts
+        self.window = window
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(workers + queue) if workers else None
+        self._lock = threading.Lock()
+        self._history: 'OrderedDict[str, deque]' = OrderedDict()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pid = None
+        atexit.register(self.close)
+
+    # ---------------- rate limiting ----------------
+    def retry_after(self, username: str) -> Optional[float]:
+        """
+        Record an attempt for ``username``; returns the seconds to wait when
+        it is over the limit (the attempt is then not recorded).
+        """
+        if not self.attempts:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            history = self._history.get(username)
+            if history is None:
+                history = self._history[username] = deque()
+            self._history.move_to_end(username)
+            while history and now - history[0] >= self.window:
+                history.popleft()
+            if len(history) >= self.attempts:
+                return self.window - (now - history[0])
+            history.append(now)
+            while len(self._history) > MAX_TRACKED_USERNAMES:
+                self._history.popitem(last=False)
+        return None
+
+    def reset(self, username: str) -> None:
+        """Forget the attempts of a username after a successful login."""
+        with self._lock:
+            self._history.pop(username, None)
+
+    # ---------------- verification ----------------
+    def verify(self, password_hash: str, password: str, method: str) -> Tuple[bool, Optional[str]]:
+        """verify_password() on the pool; raises LoginBusy when it is full."""
+        if self._slots is None:
+            return verify_password(password_hash, password, method)
+        if not self._slots.acquire(blocking=False):
+            raise LoginBusy()
+        try:
+            future = self._ensure_executor().submit(verify_password, password_hash, password, method)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result(timeout=self.timeout)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _ensure_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            # Threads do not survive a fork: each worker starts its own pool
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='login',
+                                                    initializer=self._lower_priority)
+                self._pid = os.getpid()
+            return self._executor
+
+    def _lower_priority(self) -> None:
+        # Linux schedules threads individually, so this only affects the pool
+        if self.nice and hasattr(threading, 'get_native_id') and hasattr(os, 'setpriority'):
+            try:
+                os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), self.nice)
+            except OSError:
+                pass
+
+
+def init_login(app) -> None:
+    app.extensions['login_guard'] = LoginGuard(
+        app.config['LOGIN_WORKERS'],
+        app.config['LOGIN_QUEUE'],
+        app.config['LOGIN_RATE_LIMIT'],
+        app.config['LOGIN_RATE_WINDOW'],
+        app.config['LOGIN_TIMEOUT'],
+        app.config['LOGIN_WORKER_NICE'],
+    )
+
+
+def get_login_guard() -> LoginGuard:
+    return current_app.extensions['login_guard']
@@ -8,6 +8,14 @@ from werkzeug.security import generate_password_hash, check_password_hash
 
 db = SQLAlchemy()
 
+
+def serialize_field(obj, name):
+    """Serialize one attribute the same way the to_dict methods do."""
+    value = getattr(obj, name)
+    if name == 'store':
+        return value.to_dict() if value else None
+    return value
+
 class Store(db.Model):
     """Store model - represents gift stores"""
     __tablename__ = 'stores'
@@ -24,7 +32,13 @@ class Store(db.Model):
     # Relationships
     gifts = db.relationship('Gift', backref='store', lazy=True, cascade='all, delete-orphan')
     
-    def to_dict(self):
+    # Fields accepted by to_dict(fields=...) / ?fields= projections
+    FIELDS = ('id', 'name_ar', 'name_en', 'location_url', 'description_ar',
+              'description_en', 'image_url', 'created_at')
+    
+    def to_dict(self, fields=None):
+        if fields is not None:
+            return {name: serialize_field(self, name) for name in fields}
         return {
             'id': self.id,
             'name_ar': self.name_ar,
@@ -33,13 +47,21 @@ class Store(db.Model):
             'description_ar': self.description_ar,
             'description_en': self.description_en,
             'image_url': self.image_url,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': self.created_at
         }
 
 
 class Gift(db.Model):
     """Gift model - represents individual gifts"""
     __tablename__ = 'gifts'
+    __table_args__ = (
+        # GET /gifts filters (category + budget window), /categories, admin stats
+        db.Index('ix_gifts_category_budget', 'category', 'min_budget', 'max_budget'),
+        # Age window pre-filtering for recommendations
+        db.Index('ix_gifts_age', 'min_age', 'max_age'),
+        db.Index('ix_gifts_occasion', 'occasion'),
+        db.Index('ix_gifts_store_id', 'store_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     store_id = db.Column(db.Integer, db.ForeignKey('stores.id'), nullable=False)
@@ -72,7 +94,15 @@ class Gift(db.Model):
     
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
-    def to_dict(self):
+    # Fields accepted by to_dict(fields=...) / ?fields= projections
+    FIELDS = ('id', 'store_id', 'name_ar', 'name_en', 'category', 'min_age',
+              'max_age', 'min_budget', 'max_budget', 'gender', 'occasion',
+              'personality_type', 'interests', 'image_url', 'description_ar',
+              'description_en', 'created_at', 'store')
+    
+    def to_dict(self, fields=None):
+        if fields is not None:
+            return {name: serialize_field(self, name) for name in fields}
         return {
             'id': self.id,
             'store_id': self.store_id,
@@ -90,7 +120,7 @@ class Gift(db.Model):
             'image_url': self.image_url,
             'description_ar': self.description_ar,
             'description_en': self.description_en,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'created_at': self.created_at,
             'store': self.store.to_dict() if self.store else None
         }
 
@@ -121,10 +151,19 @@ class Recommendation(db.Model):
             'relationship': self.relationship,
             'interests': self.interests,
             'results_count': self.results_count,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': self.created_at
         }
 
 
+class CatalogState(db.Model):
+    """Single-row catalog version, bumped by every admin catalog change"""
+    __tablename__ = 'catalog_state'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
 class Admin(db.Model):
     """Admin user model for dashboard access"""
     __tablename__ = 'admins'
@@ -134,8 +173,8 @@ class Admin(db.Model):
     password_hash = db.Column(db.String(255), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
-    def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+    def set_password(self, password, method='scrypt'):
+        self.password_hash = generate_password_hash(password, method)
     
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
@@ -144,5 +183,15 @@ class Admin(db.Model):
         return {
             'id': self.id,
             'username': self.username,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': self.created_at
         }
+
+
+def ensure_indexes():
+    """
+    Create any declared index missing from an existing database.
+    db.create_all() only adds indexes when it creates the table itself.
+    """
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=db.engine, checkfirst=True)
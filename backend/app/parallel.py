@@ -0,0 +1,211 @@
+"""
+Parallel recommendation scoring
+Shards the gift index across a persistent process pool. The index columns
+are published once per catalog version in shared memory; every worker maps
+them (no pickled ORM objects, no copies), scores its shard and returns a
+local top-k. The parent re-ranks the union of the local winners exactly.
+"""
+import atexit
+import logging
+import os
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context, shared_memory
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from flask import current_app
+
+from .recommendation import score_columns, score_query, top_rows
+
+logger = logging.getLogger(__name__)
+
+# Columns read by score_columns/top_rows
+SHARED_COLUMNS = ('ids', 'min_age', 'max_age', 'min_budget', 'max_budget',
+                  'personality_codes', 'occasion_codes', 'interest_bits')
+
+
+# ================== WORKER SIDE ==================
+# token -> (shared memory blocks, column arrays) for the latest published index
+_attached: Dict[str, tuple] = {}
+
+
+def _columns(spec: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    entry = _attached.get(spec['token'])
+    if entry is None:
+        # A new catalog version: drop the mappings of the previous one
+        for token in list(_attached):
+            blocks, arrays = _attached.pop(token)
+            arrays.clear()
+            for block in blocks:
+                try:
+                    block.close()
+                except BufferError:
+                    pass  # still referenced; released with the last view
+        blocks, arrays = [], {}
+        for name, (block_name, dtype, shape) in spec['columns'].items():
+            # Pool workers are spawned children and share the parent's
+            # resource tracker, so attaching does not take ownership.
+            block = shared_memory.SharedMemory(name=block_name)
+            blocks.append(block)
+            arrays[name] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+        entry = _attached[spec['token']] = (blocks, arrays)
+    return entry[1]
+
+
+def _score_shard(spec: Dict[str, Any], start: int, stop: int,
+                 query: Dict[str, Any], limit: int) -> list:
+    """Global rows of the local top-``limit`` of rows [start, stop)."""
+    shard = SimpleNamespace(**{name: values[start:stop]
+                               for name, values in _columns(spec).items()})
+    scores, _ = score_columns(shard, query)
+    return (start + top_rows(scores, shard.ids, limit)).tolist()
+
+
+# ================== PARENT SIDE ==================
+class _Published:
+    """Shared-memory copy of one index plus the requests currently scoring on it."""
+
+    def __init__(self, index: Any, spec: Dict[str, Any], blocks: List[shared_memory.SharedMemory]):
+        self.index = index
+        self.spec = spec
+        self.blocks = blocks
+        self.users = 0
+        self.retired = False
+
+    def unlink(self) -> None:
+        # Workers keep their mappings until the next version arrives;
+        # unlinking only removes the name.
+        for block in self.blocks:
+            try:
+                block.unlink()
+                block.close()
+            except (BufferError, FileNotFoundError):
+                pass
+        self.blocks = []
+
+
+class ParallelScorer:
+    """Persistent pool plus the shared-memory copy of the current index."""
+
+    def __init__(self, workers: int, shards: int, min_gifts: int):
+        self.workers = workers
+        self.shards = max(1, shards or workers)
+        self.min_gifts = min_gifts
+        self._lock = threading.Lock()
+        self._pid = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._current: Optional[_Published] = None
+        self._retired: List[_Published] = []
+        atexit.register(self.close)
+
+    def candidates(self, index: Any, criteria: Dict[str, Any], limit: int) -> Optional[np.ndarray]:
+        """
+        Sorted rows containing the exact top-``limit`` of the whole index
+        (the union of every shard's local top-k), or None when the index is
+        too small to be worth sharding or the pool is unavailable.
+        """
+        if len(index) < max(self.min_gifts, 1) or limit <= 0:
+            return None
+
+        query = score_query(index, criteria)
+        with self._lock:
+            executor = self._ensure_executor()
+            published = self._acquire(index)
+
+        bounds = np.linspace(0, len(index), self.shards + 1).astype(int).tolist()
+        futures = []
+        try:
+            for start, stop in zip(bounds, bounds[1:]):
+                if stop > start:
+                    futures.append(executor.submit(_score_shard, published.spec, start, stop,
+                                                   query, limit))
+            rows = [row for future in futures for row in future.result()]
+        except Exception as e:
+            logger.exception("Parallel scoring failed; falling back to serial scoring")
+            if isinstance(e, BrokenProcessPool):
+                with self._lock:
+                    if self._executor is executor:
+                        self._executor = None
+            return None
+        finally:
+            # The blocks must outlive every task that may still attach to them
+            wait(futures)
+            with self._lock:
+                self._done(published)
+        return np.array(sorted(rows), dtype=np.int64)
+
+    def close(self) -> None:
+        """Stop the pool and free the shared memory (called at exit)."""
+        with self._lock:
+            if self._pid != os.getpid():
+                return  # inherited through fork; the creating process cleans up
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+            for published in [self._current, *self._retired]:
+                if published is not None:
+                    published.unlink()
+            self._current, self._retired = None, []
+
+    # ---------------- internals ----------------
+    def _ensure_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None or self._pid != os.getpid():
+            # First use in this process (or after a fork): pools and shared
+            # blocks belong to the process that created them.
+            if self._pid != os.getpid():
+                self._current, self._retired = None, []
+            self._executor = ProcessPoolExecutor(self.workers, mp_context=get_context('spawn'))
+            self._pid = os.getpid()
+        return self._executor
+
+    def _acquire(self, index: Any) -> _Published:
+        """The shared copy of ``index`` (published if new), counted as in use."""
+        if self._current is None or self._current.index is not index:
+            if self._current is not None:
+                self._retire(self._current)
+            self._current = self._publish(index)
+        self._current.users += 1
+        return self._current
+
+    def _done(self, published: _Published) -> None:
+        published.users -= 1
+        if published.retired and published.users == 0:
+            self._retired.remove(published)
+            published.unlink()
+
+    def _retire(self, published: _Published) -> None:
+        published.retired = True
+        if published.users == 0:
+            published.unlink()
+        else:
+            # Other requests are still scoring on it; the last one unlinks
+            self._retired.append(published)
+
+    def _publish(self, index: Any) -> _Published:
+        blocks, columns = [], {}
+        for name in SHARED_COLUMNS:
+            values = np.ascontiguousarray(getattr(index, name))
+            block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+            np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)[...] = values
+            blocks.append(block)
+            columns[name] = (block.name, values.dtype.str, values.shape)
+        return _Published(index, {'token': uuid.uuid4().hex, 'columns': columns}, blocks)
+
+
+def init_parallel(app) -> None:
+    """Attach a ParallelScorer when RECOMMEND_PARALLEL_WORKERS is set."""
+    workers = app.config.get('RECOMMEND_PARALLEL_WORKERS', 0)
+    if workers > 0:
+        app.extensions['parallel_scorer'] = ParallelScorer(
+            workers,
+            shards=app.config.get('RECOMMEND_PARALLEL_SHARDS', 0),
+            min_gifts=app.config['RECOMMEND_PARALLEL_MIN_GIFTS'],
+        )
+
+
+def get_parallel_scorer() -> Optional[ParallelScorer]:
+    return current_app.extensions.get('parallel_scorer')
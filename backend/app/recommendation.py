@@ -2,13 +2,22 @@
 Smart Context-Aware Gift Recommendation Engine
 NO random results – Human-like logic
 """
-from typing import List, Dict, Any, Tuple
+import heapq
+from typing import Iterable, List, Dict, Any, Optional, Tuple
+
+import numpy as np
 
 def normalize(text: str) -> str:
     """Safely normalizes text for comparison."""
     return (text or '').lower().strip()
 
 
+def normalize_interests(interests: Iterable[str]) -> List[str]:
+    """Normalized, de-duplicated interests in their original order (stored on write)."""
+    names = (normalize(name) for name in interests or [])
+    return list(dict.fromkeys(name for name in names if name))
+
+
 def smart_score(gift: Any, criteria: Dict[str, Any]) -> Tuple[float, Dict[str, Any]]:
     score = 0
     details = {}
@@ -113,26 +122,408 @@ def smart_score(gift: Any, criteria: Dict[str, Any]) -> Tuple[float, Dict[str, A
     return score, details
 
 
+def _gift_id(gift: Any) -> Any:
+    return gift.get('id') if isinstance(gift, dict) else getattr(gift, 'id', None)
+
+
+def rank_gifts(gifts: Iterable[Any], criteria: Dict[str, Any], limit: int = 4) -> List[Tuple[Any, float, Dict[str, Any]]]:
+    """
+    Score gifts and return the best ones as (gift, score, details) tuples.
+
+    Only ``limit`` entries are kept (bounded heap). Gifts are ranked by their
+    displayed score, ties broken by gift id so every worker returns the same
+    order. Nothing is serialized here, so callers only pay for the winners.
+    """
+    def scored():
+        for position, gift in enumerate(gifts):
+            try:
+                # 🛑 هذا هو الاستدعاء الذي يسبب المشكلة، لكن تم إصلاحها الآن داخل smart_score
+                score, details = smart_score(gift, criteria) 
+            except Exception as e:
+                # يمكن طباعة الخطأ هنا للمراجعة إذا استمرت الأخطاء
+                # print(f"Error processing gift: {e}")
+                continue
+            gift_id = _gift_id(gift)
+            tiebreak = (position if gift_id is None else gift_id, position)
+            yield (-round(score / 100, 2), tiebreak), gift, score, details
+
+    best = heapq.nsmallest(limit, scored(), key=lambda item: item[0])
+    return [(gift, score, details) for _, gift, score, details in best]
+
+
 def get_recommendations(gifts: List[Any], criteria: Dict[str, Any], limit: int = 4) -> List[Dict[str, Any]]:
     """
     Get top gift recommendations based on criteria, limited to the best 4.
     """
-    results = []
-
-    for gift in gifts:
-        try:
-            # 🛑 هذا هو الاستدعاء الذي يسبب المشكلة، لكن تم إصلاحها الآن داخل smart_score
-            score, details = smart_score(gift, criteria) 
-            results.append({
-                'gift': getattr(gift, 'to_dict', lambda: gift)(),
-                'score': round(score / 100, 2),
-                'match_details': details
-            })
-        except Exception as e:
-            # يمكن طباعة الخطأ هنا للمراجعة إذا استمرت الأخطاء
-            # print(f"Error processing gift: {e}")
-            continue
-
-    results.sort(key=lambda x: x['score'], reverse=True)
-
-    return results[:limit]
+    return [
+        {
+            'gift': getattr(gift, 'to_dict', lambda: gift)(),
+            'score': round(score / 100, 2),
+            'match_details': details
+        }
+        for gift, score, details in rank_gifts(gifts, criteria, limit)
+    ]
+
+
+# =========================
+# BATCH (VECTORIZED) SCORING
+# =========================
+# Same rules as smart_score, evaluated for a whole columnar catalog at once
+# (see gift_index.GiftIndex). Every component is computed with the same
+# float64 operations in the same order, so scores are bit-for-bit identical.
+
+if hasattr(np, 'bitwise_count'):
+    def _popcount(words: np.ndarray) -> np.ndarray:
+        return np.bitwise_count(words).sum(axis=1, dtype=np.int64)
+else:
+    _POPCOUNT_TABLE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+    def _popcount(words: np.ndarray) -> np.ndarray:
+        bytes_ = np.ascontiguousarray(words).view(np.uint8)
+        return _POPCOUNT_TABLE[bytes_].sum(axis=1, dtype=np.int64)
+
+
+def personality_rule(user_personality: str, gift_personality: str) -> float:
+    if not user_personality or not gift_personality:
+        return 0.6
+    if user_personality in gift_personality or gift_personality in user_personality:
+        return 1
+    return 0.4
+
+
+def occasion_rule(user_occasion: str, gift_occasion: str) -> float:
+    if not user_occasion:
+        return 0.7
+    if user_occasion == gift_occasion:
+        return 1
+    if gift_occasion in ['general', 'any']:
+        return 0.7
+    return 0.4
+
+
+class CompatibilityMatrix:
+    """
+    Precomputed ``rule(user value, gift value)`` scores for one categorical
+    field. Rows are user values (the gift vocabulary itself plus ``''``),
+    columns are gift vocabulary codes, so scoring a request is one row
+    selection and one gather with no string operations. Built with the
+    GiftIndex, i.e. rebuilt whenever the catalog vocabulary changes.
+    """
+
+    MAX_EXTRA_ROWS = 256
+
+    def __init__(self, rule, gift_values: List[str]):
+        self.rule = rule
+        self.gift_values = list(gift_values)
+        user_values = list(dict.fromkeys(['', *self.gift_values]))
+        self.user_codes = {value: code for code, value in enumerate(user_values)}
+        self.matrix = np.array(
+            [[rule(user, gift) for gift in self.gift_values] for user in user_values],
+            dtype=np.float64,
+        ).reshape(len(user_values), len(self.gift_values))
+        # Rows for user values no gift uses, computed on first request
+        self._extra: Dict[str, np.ndarray] = {}
+
+    def row(self, user_value: str) -> np.ndarray:
+        code = self.user_codes.get(user_value)
+        if code is not None:
+            return self.matrix[code]
+        row = self._extra.get(user_value)
+        if row is None:
+            row = np.array([self.rule(user_value, gift) for gift in self.gift_values],
+                           dtype=np.float64)
+            if len(self._extra) < self.MAX_EXTRA_ROWS:
+                self._extra[user_value] = row
+        return row
+
+    def scores(self, user_value: str, codes: np.ndarray) -> np.ndarray:
+        return self.row(user_value)[codes]
+
+
+def interest_rows(index: Any, user_interests: Iterable[str]) -> np.ndarray:
+    """Sorted rows of the gifts sharing at least one interest (inverted index)."""
+    lists = [index.postings[code] for code in
+             (index.interest_vocab.codes.get(name) for name in user_interests)
+             if code is not None]
+    if not lists:
+        return np.empty(0, dtype=np.int64)
+    return lists[0] if len(lists) == 1 else np.unique(np.concatenate(lists))
+
+
+def interest_mask(index: Any, user_interests: Iterable[str]) -> np.ndarray:
+    """Bitset of the user's interests over the index interest vocabulary."""
+    mask = np.zeros(index.words, dtype=np.uint64)
+    for name in user_interests:
+        code = index.interest_vocab.codes.get(name)
+        if code is not None:
+            mask[code >> 6] |= np.uint64(1 << (code & 63))
+    return mask
+
+
+def score_query(index: Any, criteria: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    The per-request inputs of score_columns: everything derived from the
+    criteria and the index vocabularies (interest mask, compatibility rows).
+    Small and picklable, so it can be shipped to other processes.
+    """
+    user_interests = set(map(normalize, criteria.get('interests', [])))
+    return {
+        'interest_mask': interest_mask(index, user_interests),
+        'interest_count': len(user_interests),
+        'personality': index.personality_matrix.row(normalize(criteria.get('personality_type'))),
+        'occasion': index.occasion_matrix.row(normalize(criteria.get('occasion'))),
+        'age': criteria.get('age'),
+        'budget': criteria.get('budget'),
+    }
+
+
+def score_columns(columns: Any, query: Dict[str, Any]) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Vectorized smart_score over aligned column arrays (``min_age``,
+    ``interest_bits``, ``personality_codes``, ...; any object exposing them
+    as attributes). Returns the total scores and the per-component scores
+    (0..1 scale).
+    """
+    n = len(columns.min_age)
+
+    # INTERESTS (30%)
+    if query['interest_count']:
+        overlap = _popcount(columns.interest_bits & query['interest_mask'])
+        interest = overlap / query['interest_count']
+    else:
+        interest = np.full(n, 0.6)
+
+    # PERSONALITY (20%) / OCCASION (20%)
+    personality = query['personality'][columns.personality_codes]
+    occasion = query['occasion'][columns.occasion_codes]
+
+    # AGE (15%)
+    age = query['age']
+    if age is None:
+        age_score = np.full(n, 0.6)
+    else:
+        min_age, max_age = columns.min_age, columns.max_age
+        inside = (min_age <= age) & (age <= max_age)
+        diff = np.minimum(np.abs(age - min_age), np.abs(age - max_age))
+        age_score = np.where(inside, 1.0, np.maximum(0.4, 1 - diff / 20))
+
+    # BUDGET (15%)
+    budget = query['budget']
+    if budget is None:
+        budget_score = np.full(n, 0.6)
+    else:
+        min_budget, max_budget = columns.min_budget, columns.max_budget
+        penalty_base = np.where(min_budget > 0, min_budget, 1.0)
+        below = np.maximum(0.4, 1 - (min_budget - budget) / penalty_base)
+        above = np.maximum(0.4, 1 - (budget - max_budget) / 100)
+        budget_score = np.where(
+            (min_budget <= budget) & (budget <= max_budget), 1.0,
+            np.where(budget < min_budget, below, above),
+        )
+
+    score = interest * 30
+    score += personality * 20
+    score += occasion * 20
+    score += age_score * 15
+    score += budget_score * 15
+
+    return score, {
+        'interest': interest,
+        'personality': personality,
+        'occasion': occasion,
+        'age': age_score,
+        'budget': budget_score,
+    }
+
+
+class _RowSelection:
+    """Column arrays of an index restricted to some rows (gathered on access)."""
+
+    def __init__(self, index: Any, rows: np.ndarray):
+        self._index = index
+        self._rows = rows
+
+    def __getattr__(self, name: str) -> np.ndarray:
+        return getattr(self._index, name)[self._rows]
+
+
+def score_batch(index: Any, criteria: Dict[str, Any],
+                rows: Optional[np.ndarray] = None) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Vectorized smart_score over every gift of a columnar index (or only the
+    given rows). Returns the total scores and the per-component scores
+    (0..1 scale), aligned with ``rows`` when it is given.
+    """
+    columns = index if rows is None else _RowSelection(index, rows)
+    return score_columns(columns, score_query(index, criteria))
+
+
+def batch_details(index: Any, row: int, score: float, components: Dict[str, np.ndarray],
+                  criteria: Dict[str, Any], position: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Build the smart_score ``details`` dict for one row of a batch result.
+    ``position`` locates the row in ``components`` when only a subset of
+    rows was scored (defaults to ``row``).
+    """
+    if position is None:
+        position = row
+
+    user_interests = set(map(normalize, criteria.get('interests', [])))
+    common: set = set()
+    if user_interests:
+        common = user_interests & set(index.interests[row])
+
+    return {
+        'interest': round(components['interest'][position].item() * 100),
+        'common_interests': list(common),
+        'personality': round(components['personality'][position].item() * 100),
+        'occasion': round(components['occasion'][position].item() * 100),
+        'age': round(components['age'][position].item() * 100),
+        'budget': round(components['budget'][position].item() * 100),
+        'total_score': round(score, 1),
+    }
+
+
+# =========================
+# CANDIDATE PRE-FILTERING
+# =========================
+# A gift 12+ years outside its age range, or far enough outside its budget
+# range, gets the 0.4 floor for that component, and a gift sharing none of
+# the user's interests scores 0 for interests. Such gifts can be skipped when
+# the best score they could still reach is clearly below the k-th best
+# candidate (branch and bound). The relative slack keeps the window tests
+# conservative.
+_SLACK = 1e-9
+
+
+def prefilter(index: Any, criteria: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Coarse candidate stage. Returns the rows that pass the age window, budget
+    window and interest overlap tests, the other (skipped) rows, and the
+    highest score each skipped row could still reach.
+    """
+    n = len(index)
+    valid_age = index.min_age <= index.max_age
+    valid_budget = index.min_budget <= index.max_budget
+    fail_age = np.zeros(n, dtype=bool)
+    fail_budget = np.zeros(n, dtype=bool)
+    fail_interest = np.zeros(n, dtype=bool)
+
+    age = criteria.get('age')
+    if age is not None:
+        window = 12 * (1 + _SLACK)
+        fail_age = valid_age & ((index.min_age - age >= window) | (age - index.max_age >= window))
+
+    budget = criteria.get('budget')
+    if budget is not None:
+        min_budget = index.min_budget
+        below = (min_budget > 0) & (min_budget - budget >= 0.6 * min_budget * (1 + _SLACK))
+        above = budget - index.max_budget >= 60 * (1 + _SLACK)
+        fail_budget = valid_budget & (below | above)
+
+    user_interests = set(map(normalize, criteria.get('interests', [])))
+    best_interest = 0.6
+    if user_interests:
+        mask = interest_mask(index, user_interests)
+        known = sum(name in index.interest_vocab.codes for name in user_interests)
+        best_interest = known / len(user_interests)
+        if known:
+            fail_interest = ~(index.interest_bits & mask).any(axis=1)
+
+    failed = fail_age | fail_budget | fail_interest
+    if not failed.any():
+        return np.arange(n), np.empty(0, dtype=np.int64), np.empty(0)
+
+    # Ceiling of each skipped gift: its exact personality/occasion scores,
+    # the best interest ratio any gift could reach, and the floors it hit.
+    rows = np.flatnonzero(failed)
+    personality = index.personality_matrix.scores(
+        normalize(criteria.get('personality_type')), index.personality_codes[rows])
+    occasion = index.occasion_matrix.scores(
+        normalize(criteria.get('occasion')), index.occasion_codes[rows])
+    ceilings = (np.where(fail_interest[rows], 0.0, best_interest) * 30
+                + personality * 20 + occasion * 20
+                + np.where(fail_age[rows], 0.4, 1.0) * 15
+                + np.where(fail_budget[rows], 0.4, 1.0) * 15)
+    return np.flatnonzero(~failed), rows, ceilings
+
+
+def top_rows(scores: np.ndarray, ids: np.ndarray, limit: int) -> np.ndarray:
+    """
+    Rows of the best ``limit`` scores, ordered like rank_gifts: by displayed
+    score (score / 100 rounded to 2 places) descending, then by gift id.
+
+    argpartition finds the k-th best raw score; everything within one
+    display step of it is a candidate, and only candidates get exact keys.
+    """
+    n = len(scores)
+    k = min(limit, n)
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+
+    if k < n:
+        kth = scores[np.argpartition(scores, n - k)[n - k]]
+        rows = np.flatnonzero(scores >= kth - 1.5)
+    else:
+        rows = np.arange(n)
+
+    # Python's round() on each distinct value keeps the ordering identical
+    # to the scalar path (np.round differs on some half-way cases).
+    values, inverse = np.unique(scores[rows], return_inverse=True)
+    keys = np.array([round(value / 100, 2) for value in values.tolist()])[inverse.ravel()]
+    order = np.lexsort((ids[rows], -keys))
+    return rows[order[:k]]
+
+
+def rank_index(index: Any, criteria: Dict[str, Any], limit: int = 4,
+               use_prefilter: bool = False, scorer: Any = None) -> List[Tuple[Any, float, Dict[str, Any]]]:
+    """
+    Batch counterpart of rank_gifts for a columnar index.
+    Returns (index.gift(row), score, details) tuples in the same order.
+
+    With ``criteria['strict_interests']`` only gifts sharing at least one of
+    the user's interests are considered (fetched via the inverted index).
+
+    With ``use_prefilter`` the prefilter candidates are scored first; skipped
+    gifts are only scored if their ceiling comes within one display step of
+    the k-th candidate, so the result is always the exhaustive top-k.
+
+    With a ``scorer`` (parallel.ParallelScorer) the full-catalog pass is
+    sharded across processes and only the union of the shard winners is
+    re-scored here.
+    """
+    if not len(index):
+        return []
+
+    try:
+        rows = None
+        user_interests = set(map(normalize, criteria.get('interests', [])))
+        if criteria.get('strict_interests') and user_interests:
+            rows = interest_rows(index, user_interests)
+            if not len(rows):
+                return []
+        elif use_prefilter:
+            candidates, skipped, ceilings = prefilter(index, criteria)
+            if len(skipped) and len(candidates) >= limit > 0:
+                scores, _ = score_batch(index, criteria, candidates)
+                kth = scores[top_rows(scores, index.ids[candidates], limit)[-1]]
+                keep = np.zeros(len(index), dtype=bool)
+                keep[candidates] = True
+                keep[skipped[ceilings >= kth - 1.0]] = True
+                rows = np.flatnonzero(keep)
+        if rows is None and scorer is not None:
+            rows = scorer.candidates(index, criteria, limit)
+
+        scores, components = score_batch(index, criteria, rows)
+        positions = top_rows(scores, index.ids if rows is None else index.ids[rows], limit)
+    except (AttributeError, TypeError, ValueError):
+        # Malformed criteria make smart_score fail for every gift
+        return []
+
+    ranked = []
+    for position in positions.tolist():
+        row = position if rows is None else int(rows[position])
+        score = scores[position].item()
+        ranked.append((index.gift(row), score,
+                       batch_details(index, row, score, components, criteria, position)))
+    return ranked
@@ -3,46 +3,319 @@ API Routes for Gift Finder
 Public & Admin routes (JWT Authentication)
 """
 
-from flask import Blueprint, request, jsonify
-from functools import wraps
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
+import csv
+import io
+import math
 from sqlalchemy import func
-import jwt
-import os
+from sqlalchemy.orm import load_only, selectinload
 
 from .models import db, Store, Gift, Recommendation, Admin
-from .recommendation import get_recommendations
-
-# ================== CONFIG ==================
-JWT_SECRET = os.getenv("JWT_SECRET", "super-secret-key")
-JWT_ALGORITHM = "HS256"
+from .recommendation import normalize_interests, rank_index
+from .cache import get_cache
+from .catalog import catalog_version, commit_catalog_change
+from .gift_index import get_gift_index
+from .parallel import get_parallel_scorer
+from .history import history_metrics, history_record, record_history
+from .instrumentation import phase, request_metrics
+from .importer import detect_format, import_stream
+from .auth import admin_required, issue_admin_token, token_cache_metrics
+from .login import LoginBusy, get_login_guard
+from .bulk import bulk_create, bulk_delete, bulk_update
+from .http_cache import conditional
+from .snapshot import get_snapshot
+from .compression import Precompressed, choose_encoding, encode_response
 
 # ================== BLUEPRINTS ==================
 api = Blueprint("api", __name__)
 admin_bp = Blueprint("admin", __name__)
 
-# ================== AUTH DECORATOR ==================
-def admin_required(f):
-    @wraps(f)
-    def decorated(*args, **kwargs):
-        auth_header = request.headers.get("Authorization")
+# ================== HELPERS ==================
+def requested_fields(model):
+    """Parse ?fields=a,b,c into a list (None means every field)."""
+    raw = request.args.get("fields")
+    if not raw:
+        return None
+
+    fields = [name.strip() for name in raw.split(",") if name.strip()]
+    unknown = sorted(set(fields) - set(model.FIELDS))
+    if unknown:
+        raise ValueError("Unknown fields: " + ", ".join(unknown))
+    return fields
+
+def project(query, model, fields):
+    """Only SELECT the columns a ?fields= projection needs."""
+    if fields is None:
+        return query
+
+    columns = model.__table__.columns.keys()
+    needed = [name for name in fields if name in columns]
+    if "store" in fields:
+        needed.append("store_id")
+    return query.options(load_only(*[getattr(model, name) for name in needed]))
+
+def gift_query(fields=None):
+    """Gift query that loads all referenced stores in one extra SELECT (no N+1)."""
+    query = Gift.query
+    if fields is None or "store" in fields:
+        query = query.options(selectinload(Gift.store))
+    return project(query, Gift, fields)
 
-        if not auth_header or not auth_header.startswith("Bearer "):
-            return jsonify({"error": "Authorization header missing"}), 401
+def list_response(query, model, fields=None):
+    """
+    Serialize a listing query.
+    Without ?after_id= / ?limit= the whole result is returned as a plain array;
+    with them it is paginated by id: {"items", "next_after_id", "limit"}.
+    """
+    after_id = request.args.get("after_id", type=int)
+    limit = request.args.get("limit", type=int)
 
-        try:
-            token = auth_header.split(" ")[1]
-            payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+    if after_id is None and limit is None:
+        return jsonify([row.to_dict(fields) for row in query.all()])
+
+    limit = min(max(limit or current_app.config["PAGE_SIZE_DEFAULT"], 1),
+                current_app.config["PAGE_SIZE_MAX"])
+
+    query = query.order_by(model.id)
+    if after_id is not None:
+        query = query.filter(model.id > after_id)
+
+    rows = query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
 
-            if payload.get("role") != "admin":
-                return jsonify({"error": "Unauthorized"}), 401
+    return jsonify({
+        "items": [row.to_dict(fields) for row in rows],
+        "next_after_id": rows[-1].id if has_more else None,
+        "limit": limit,
+    })
 
-        except jwt.ExpiredSignatureError:
-            return jsonify({"error": "Token expired"}), 401
-        except jwt.InvalidTokenError:
-            return jsonify({"error": "Invalid token"}), 401
+def stream_response(query, model, fields=None, fmt="ndjson"):
+    """
+    Stream a query as NDJSON (one object per line) or as a chunked JSON array.
+    Rows are fetched with yield_per and written batch by batch, so memory
+    stays flat regardless of table size.
+    """
+    batch_size = current_app.config["EXPORT_BATCH_SIZE"]
+    dumps = current_app.json.dumps
+
+    def batches():
+        batch = []
+        for row in query.order_by(model.id).yield_per(batch_size):
+            batch.append(dumps(row.to_dict(fields)))
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def generate():
+        if fmt == "ndjson":
+            for batch in batches():
+                yield "\n".join(batch) + "\n"
+            return
+
+        yield "["
+        separator = ""
+        for batch in batches():
+            yield separator + ",".join(batch)
+            separator = ","
+        yield "]"
+
+    mimetype = "application/x-ndjson" if fmt == "ndjson" else "application/json"
+    return Response(stream_with_context(generate()), mimetype=mimetype)
+
+def load_gifts(ids, chunk=500):
+    """Gifts (with their stores) by id, in chunks that fit SQLite's parameter limit."""
+    ids = list(dict.fromkeys(ids))
+    gifts = {}
+    for start in range(0, len(ids), chunk):
+        query = gift_query().filter(Gift.id.in_(ids[start:start + chunk]))
+        gifts.update((g.id, g) for g in query.all())
+    return gifts
+
+def serialize_ranked(ranked, gifts=None):
+    """Load only the winning gifts from the DB and build the response items."""
+    if gifts is None:
+        gifts = load_gifts(gift.id for gift, _, _ in ranked)
+
+    return [
+        {
+            "gift": gifts[gift.id].to_dict(),
+            "score": round(score / 100, 2),
+            "match_details": details,
+        }
+        for gift, score, details in ranked
+        if gift.id in gifts  # deleted since the index was built
+    ]
+
+def import_response(model):
+    """
+    Bulk import for the admin /<stores|gifts>/import routes. The body is the
+    CSV / NDJSON data itself or a multipart upload named "file"; the format
+    comes from ?format=, the file name or the content type.
+    """
+    upload = request.files.get("file")
+    fmt = request.args.get("format") or (
+        detect_format(upload.filename, upload.content_type) if upload
+        else detect_format(None, request.content_type)
+    )
+    if fmt not in ("csv", "ndjson"):
+        return jsonify({"error": "format must be csv or ndjson"}), 400
+
+    stream = io.TextIOWrapper(upload.stream if upload else request.stream,
+                              encoding="utf-8-sig", newline="")
+    try:
+        result = import_stream(model, stream, fmt, request.args.get("batch_size", type=int))
+    except (UnicodeDecodeError, csv.Error) as e:
+        return jsonify({"error": f"Unreadable {fmt} data: {e}"}), 400
+    return jsonify(result), 201 if result["inserted"] else 200
+
+def bulk_response(model):
+    """
+    Bulk admin changes for the /<stores|gifts>/bulk routes: POST creates,
+    PATCH updates ({"id": ..., field: value}) and DELETE removes by id. The
+    body is a JSON list (or {"items": [...]}, {"ids": [...]} for DELETE);
+    every item gets an entry in "results", failed ones with an "error".
+    """
+    data = request.get_json(silent=True)
+    key = "ids" if request.method == "DELETE" else "items"
+    items = data.get(key) if isinstance(data, dict) else data
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": f"A non-empty list of {key} is required"}), 400
+
+    max_items = current_app.config["ADMIN_BULK_MAX"]
+    if len(items) > max_items:
+        return jsonify({"error": f"At most {max_items} {key} per request"}), 400
+
+    if request.method == "POST":
+        result = bulk_create(model, items)
+        return jsonify(result), 201 if result["succeeded"] else 200
+    if request.method == "PATCH":
+        return jsonify(bulk_update(model, items))
+    return jsonify(bulk_delete(model, items))
+
+def raw_json_response(body):
+    """
+    Pre-serialized JSON: bytes, or a Precompressed listing served in the
+    negotiated content coding (compressed once per catalog version).
+    """
+    if not isinstance(body, Precompressed):
+        return current_app.response_class(body, mimetype="application/json")
+
+    response = current_app.response_class(body.data, mimetype="application/json")
+    if len(body.data) >= current_app.config["COMPRESSION_MIN_SIZE"]:
+        response.vary.add("Accept-Encoding")
+        encoding = choose_encoding() if current_app.config["COMPRESSION_ENABLED"] else None
+        if encoding:
+            encode_response(response, body.variant(encoding), encoding)
+    return response
+
+def snapshot_listing(key):
+    """Response for a pre-rendered listing, or None without a snapshot."""
+    with phase("snapshot"):
+        snapshot = get_snapshot()
+        if snapshot is None:
+            return None
+        body = snapshot.body(key)
+    return raw_json_response(body if body else b"[]\n")
+
+def gift_payload(data):
+    """Admin gift payload with interests stored normalized (lowercase, unique)."""
+    if isinstance(data.get("interests"), list):
+        data = dict(data, interests=normalize_interests(data["interests"]))
+    return data
+
+def positive_number(data, name):
+    """A finite, positive number from a JSON value (numeric strings accepted)."""
+    value = data[name]
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ValueError(f"{name} must be a number")
+    try:
+        number = float(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a number") from None
+    if not math.isfinite(number) or number <= 0:
+        raise ValueError(f"{name} must be a positive number")
+    return number
+
+def optional_text(data, name):
+    value = data.get(name)
+    if value is not None and not isinstance(value, str):
+        raise ValueError(f"{name} must be a string")
+    return value
+
+def recommendation_criteria(data):
+    """
+    Criteria dict of one recommend request, or None when age/budget are
+    missing. Values are coerced to the history columns' types; raises
+    ValueError for values that cannot be.
+    """
+    if not isinstance(data, dict) or not data.get("age") or not data.get("budget"):
+        return None
+
+    interests = data.get("interests") or []
+    if not isinstance(interests, list) or not all(isinstance(i, str) for i in interests):
+        raise ValueError("interests must be a list of strings")
+
+    return {
+        "age": int(positive_number(data, "age")),
+        "budget": positive_number(data, "budget"),
+        "interests": interests,
+        "gender": optional_text(data, "gender"),
+        "occasion": optional_text(data, "occasion"),
+        "personality_type": optional_text(data, "personality_type"),
+        "relationship": optional_text(data, "relationship"),
+        "strict_interests": bool(data.get("strict_interests")),
+    }
 
-        return f(*args, **kwargs)
-    return decorated
+def recommendation_bodies(criteria_list, limit=4):
+    """
+    JSON bodies of the top recommendations for several criteria dicts, served
+    from the result cache when possible. The gift index is fetched once,
+    identical criteria are ranked once, and all winners are loaded from the
+    DB together. Returns a list of (results_count, body) in input order.
+    """
+    cache = get_cache()
+    version = catalog_version()
+    results = [None] * len(criteria_list)
+
+    # Cache misses grouped by cache key (uncacheable criteria stand alone)
+    pending = {}
+    with phase("cache"):
+        for position, criteria in enumerate(criteria_list):
+            key = cache.key(criteria, version, limit) if cache else None
+            cached = cache.get(key) if key else None
+            if cached is not None:
+                results[position] = cached
+            else:
+                pending.setdefault(key or ("position", position), (criteria, []))[1].append(position)
+
+    if pending:
+        with phase("index"):
+            index = get_gift_index()
+        with phase("score"):
+            options = {"use_prefilter": current_app.config["RECOMMEND_PREFILTER"],
+                       "scorer": get_parallel_scorer()}
+            ranked = {group: rank_index(index, criteria, limit, **options)
+                      for group, (criteria, _) in pending.items()}
+        with phase("load"):
+            gifts = load_gifts(gift.id for items in ranked.values() for gift, _, _ in items)
+
+        with phase("serialize"):
+            for group, (_, positions) in pending.items():
+                recommendations = serialize_ranked(ranked[group], gifts)
+                body = current_app.json.dumps(recommendations)
+                if isinstance(group, str):
+                    cache.set(group, len(recommendations), body)
+                for position in positions:
+                    results[position] = (len(recommendations), body)
+
+    return results
+
+def recommendation_body(criteria, limit=4):
+    """Single-criteria recommendation_bodies(). Returns (results_count, body)."""
+    return recommendation_bodies([criteria], limit)[0]
 
 # ================== PUBLIC ROUTES ==================
 @api.route("/health", methods=["GET"])
@@ -50,21 +323,44 @@ def health_check():
     return jsonify({"status": "ok", "message": "Gift Finder API is running"})
 
 @api.route("/stores", methods=["GET"])
+@conditional()
 def get_stores():
-    return jsonify([s.to_dict() for s in Store.query.all()])
+    if not request.args:
+        response = snapshot_listing("stores")
+        if response is not None:
+            return response
+
+    try:
+        fields = requested_fields(Store)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return list_response(project(Store.query, Store, fields), Store, fields)
 
 @api.route("/stores/<int:store_id>", methods=["GET"])
+@conditional()
 def get_store(store_id):
     store = Store.query.get_or_404(store_id)
     return jsonify(store.to_dict())
 
 @api.route("/gifts", methods=["GET"])
+@conditional()
 def get_gifts():
     category = request.args.get("category")
+    if request.args.keys() <= {"category"}:
+        response = snapshot_listing("gifts:" + category if category else "gifts")
+        if response is not None:
+            return response
+
     min_budget = request.args.get("min_budget", type=float)
     max_budget = request.args.get("max_budget", type=float)
 
-    query = Gift.query
+    try:
+        fields = requested_fields(Gift)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    query = gift_query(fields)
     if category:
         query = query.filter(Gift.category == category)
     if min_budget:
@@ -72,50 +368,67 @@ def get_gifts():
     if max_budget:
         query = query.filter(Gift.min_budget <= max_budget)
 
-    return jsonify([g.to_dict() for g in query.all()])
+    return list_response(query, Gift, fields)
 
 @api.route("/gifts/<int:gift_id>", methods=["GET"])
+@conditional()
 def get_gift(gift_id):
     gift = Gift.query.get_or_404(gift_id)
     return jsonify(gift.to_dict())
 
 @api.route("/gifts/recommend", methods=["POST"])
 def recommend_gifts():
-    data = request.get_json()
-
-    if not data.get("age") or not data.get("budget"):
+    try:
+        criteria = recommendation_criteria(request.get_json(silent=True))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if criteria is None:
         return jsonify({"error": "Age and budget required"}), 400
 
-    criteria = {
-        "age": data["age"],
-        "budget": data["budget"],
-        "interests": data.get("interests", []),
-        "gender": data.get("gender"),
-        "occasion": data.get("occasion"),
-        "personality_type": data.get("personality_type"),
-        "relationship": data.get("relationship"),
-    }
-
-    gifts = Gift.query.all()
-    recommendations = get_recommendations(gifts, criteria)
-
-    history = Recommendation(
-        age=criteria["age"],
-        budget=criteria["budget"],
-        gender=criteria.get("gender"),
-        occasion=criteria.get("occasion"),
-        personality_type=criteria.get("personality_type"),
-        relationship=criteria.get("relationship"),
-        interests=criteria["interests"],
-        results_count=len(recommendations),
-    )
-
-    db.session.add(history)
-    db.session.commit()
-
-    return jsonify(recommendations)
+    results_count, body = recommendation_body(criteria)
+    with phase("history"):
+        record_history([history_record(criteria, results_count)])
+
+    return current_app.response_class(body + "\n", mimetype="application/json")
+
+@api.route("/gifts/recommend/batch", methods=["POST"])
+def recommend_gifts_batch():
+    """
+    Recommendations for many criteria in one call. Accepts a JSON list of
+    criteria objects (or {"criteria": [...]}) and returns a list with the
+    /gifts/recommend response of each one, in the same order.
+    """
+    data = request.get_json(silent=True)
+    items = data.get("criteria") if isinstance(data, dict) else data
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "A non-empty list of criteria is required"}), 400
+
+    max_items = current_app.config["RECOMMEND_BATCH_MAX"]
+    if len(items) > max_items:
+        return jsonify({"error": f"At most {max_items} criteria per batch"}), 400
+
+    criteria_list = []
+    for position, item in enumerate(items):
+        try:
+            criteria = recommendation_criteria(item)
+        except ValueError as e:
+            return jsonify({"error": str(e), "index": position}), 400
+        if criteria is None:
+            return jsonify({"error": "Age and budget required", "index": position}), 400
+        criteria_list.append(criteria)
+
+    results = recommendation_bodies(criteria_list)
+    with phase("history"):
+        record_history([
+            history_record(criteria, results_count)
+            for criteria, (results_count, _) in zip(criteria_list, results)
+        ])
+
+    body = "[" + ",".join(body for _, body in results) + "]\n"
+    return current_app.response_class(body, mimetype="application/json")
 
 @api.route("/interests", methods=["GET"])
+@conditional("CACHE_CONTROL_STATIC")
 def get_interests():
     return jsonify([
         "gaming", "sports", "reading", "music", "technology",
@@ -123,7 +436,12 @@ def get_interests():
     ])
 
 @api.route("/categories", methods=["GET"])
+@conditional()
 def get_categories():
+    response = snapshot_listing("categories")
+    if response is not None:
+        return response
+
     categories = db.session.query(Gift.category).distinct().all()
     return jsonify([c[0] for c in categories])
 
@@ -131,20 +449,39 @@ def get_categories():
 @admin_bp.route("/login", methods=["POST"])
 def admin_login():
     data = request.get_json()
-
-    admin = Admin.query.filter_by(username=data.get("username")).first()
-    if not admin or not admin.check_password(data.get("password")):
+    username = data.get("username")
+    password = data.get("password")
+    if not isinstance(username, str) or not isinstance(password, str):
         return jsonify({"error": "Invalid credentials"}), 401
 
-    token = jwt.encode(
-        {"role": "admin", "admin_id": admin.id},
-        JWT_SECRET,
-        algorithm=JWT_ALGORITHM,
-    )
+    # Throttle before any hashing: a login storm costs a dict lookup per try
+    guard = get_login_guard()
+    retry_after = guard.retry_after(username)
+    if retry_after is not None:
+        response = jsonify({"error": "Too many login attempts, try again later"})
+        response.headers["Retry-After"] = str(math.ceil(retry_after))
+        return response, 429
 
-    if isinstance(token, bytes):
-        token = token.decode("utf-8")
+    admin = Admin.query.filter_by(username=username).first()
+    if not admin:
+        return jsonify({"error": "Invalid credentials"}), 401
+    try:
+        valid, upgraded_hash = guard.verify(admin.password_hash, password,
+                                            current_app.config["PASSWORD_HASH_METHOD"])
+    except (LoginBusy, TimeoutError):
+        response = jsonify({"error": "Login is busy, try again shortly"})
+        response.headers["Retry-After"] = "1"
+        return response, 503
+    if not valid:
+        return jsonify({"error": "Invalid credentials"}), 401
 
+    guard.reset(username)
+    if upgraded_hash:
+        # Stored with older hash parameters: swap in the configured ones
+        admin.password_hash = upgraded_hash
+        db.session.commit()
+
+    token = issue_admin_token(admin)
     return jsonify({"token": token})
 
 # ================== ADMIN DASHBOARD ==================
@@ -163,6 +500,17 @@ def admin_stats():
         ]
     })
 
+@admin_bp.route("/metrics", methods=["GET"])
+@admin_required
+def admin_metrics():
+    cache = get_cache()
+    return jsonify({
+        "history_writer": history_metrics(),
+        "recommend_cache": cache.metrics() if cache else None,
+        "endpoints": request_metrics(),
+        "token_cache": token_cache_metrics(),
+    })
+
 # ================== ADMIN STORES ==================
 @admin_bp.route("/stores", methods=["GET"])
 @admin_required
@@ -174,7 +522,7 @@ def admin_get_stores():
 def admin_create_store():
     store = Store(**request.get_json())
     db.session.add(store)
-    db.session.commit()
+    commit_catalog_change()
     return jsonify(store.to_dict()), 201
 
 @admin_bp.route("/stores/<int:store_id>", methods=["PUT"])
@@ -183,7 +531,7 @@ def admin_update_store(store_id):
     store = Store.query.get_or_404(store_id)
     for k, v in request.get_json().items():
         setattr(store, k, v)
-    db.session.commit()
+    commit_catalog_change()
     return jsonify(store.to_dict())
 
 @admin_bp.route("/stores/<int:store_id>", methods=["DELETE"])
@@ -191,30 +539,50 @@ def admin_update_store(store_id):
 def admin_delete_store(store_id):
     store = Store.query.get_or_404(store_id)
     db.session.delete(store)
-    db.session.commit()
+    commit_catalog_change()
     return jsonify({"message": "Store deleted"})
 
+@admin_bp.route("/stores/bulk", methods=["POST", "PATCH", "DELETE"])
+@admin_required
+def admin_bulk_stores():
+    return bulk_response(Store)
+
+@admin_bp.route("/stores/import", methods=["POST"])
+@admin_required
+def admin_import_stores():
+    return import_response(Store)
+
 # ================== ADMIN GIFTS ==================
 @admin_bp.route("/gifts", methods=["GET"])
 @admin_required
 def admin_get_gifts():
-    return jsonify([g.to_dict() for g in Gift.query.all()])
+    try:
+        fields = requested_fields(Gift)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # Large exports: ?format=ndjson or ?format=stream (chunked JSON array)
+    fmt = request.args.get("format")
+    if fmt in ("ndjson", "stream"):
+        return stream_response(gift_query(fields), Gift, fields, fmt)
+
+    return list_response(gift_query(fields), Gift, fields)
 
 @admin_bp.route("/gifts", methods=["POST"])
 @admin_required
 def admin_create_gift():
-    gift = Gift(**request.get_json())
+    gift = Gift(**gift_payload(request.get_json()))
     db.session.add(gift)
-    db.session.commit()
+    commit_catalog_change()
     return jsonify(gift.to_dict()), 201
 
 @admin_bp.route("/gifts/<int:gift_id>", methods=["PUT"])
 @admin_required
 def admin_update_gift(gift_id):
     gift = Gift.query.get_or_404(gift_id)
-    for k, v in request.get_json().items():
+    for k, v in gift_payload(request.get_json()).items():
         setattr(gift, k, v)
-    db.session.commit()
+    commit_catalog_change()
     return jsonify(gift.to_dict())
 
 @admin_bp.route("/gifts/<int:gift_id>", methods=["DELETE"])
@@ -222,5 +590,15 @@ def admin_update_gift(gift_id):
 def admin_delete_gift(gift_id):
     gift = Gift.query.get_or_404(gift_id)
     db.session.delete(gift)
-    db.session.commit()
+    commit_catalog_change()
     return jsonify({"message": "Gift deleted"})
+
+@admin_bp.route("/gifts/bulk", methods=["POST", "PATCH", "DELETE"])
+@admin_required
+def admin_bulk_gifts():
+    return bulk_response(Gift)
+
+@admin_bp.route("/gifts/import", methods=["POST"])
+@admin_required
+def admin_import_gifts():
+    return import_response(Gift)
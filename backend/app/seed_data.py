@@ -3,6 +3,8 @@ Seed database with initial data
 Enhanced with new fields: gender, occasion, personality_type
 """
 from .models import db, Store, Gift
+from .catalog import commit_catalog_change
+from .importer import import_records
 
 
 def seed_stores():
@@ -66,11 +68,8 @@ def seed_stores():
         }
     ]
     
-    for store_data in stores_data:
-        if not Store.query.filter_by(name_en=store_data['name_en']).first():
-            store = Store(**store_data)
-            db.session.add(store)
-    
+    # Existing stores are skipped by name_en (one prefetch, no per-row queries)
+    import_records(Store, enumerate(stores_data, start=1))
     db.session.commit()
     print(f"✅ Seeded {len(stores_data)} stores")
 
@@ -78,14 +77,14 @@ def seed_stores():
 def seed_gifts():
     """Seed gifts data with enhanced fields"""
     
-    # Get store references
-    store_974 = Store.query.filter_by(name_en='974 Store').first()
-    store_ms = Store.query.filter_by(name_en='Marks & Spencer').first()
-    store_sports = Store.query.filter_by(name_en='Sports Corner').first()
-    store_geekay = Store.query.filter_by(name_en='Geekay').first()
-    store_home = Store.query.filter_by(name_en='Home Centre').first()
-    store_virtuo = Store.query.filter_by(name_en='Virtuocity').first()
-    store_virgin = Store.query.filter_by(name_en='Virgin Megastore').first()
+    # Get store references (by name_en; resolved to ids by the importer)
+    store_974 = '974 Store'
+    store_ms = 'Marks & Spencer'
+    store_sports = 'Sports Corner'
+    store_geekay = 'Geekay'
+    store_home = 'Home Centre'
+    store_virtuo = 'Virtuocity'
+    store_virgin = 'Virgin Megastore'
     
     gifts_data = [
         # 974 Store
@@ -403,15 +402,8 @@ def seed_gifts():
         }
     ]
     
-    for gift_data in gifts_data:
-        store = gift_data.pop('store')
-        if store and not Gift.query.filter_by(
-            name_en=gift_data['name_en'],
-            store_id=store.id
-        ).first():
-            gift = Gift(store_id=store.id, **gift_data)
-            db.session.add(gift)
-    
+    # Existing gifts are skipped by (store, name_en) against one prefetched key set
+    import_records(Gift, enumerate(gifts_data, start=1))
     db.session.commit()
     print(f"✅ Seeded {len(gifts_data)} gifts")
 
@@ -420,4 +412,5 @@ def seed_all_data():
     """Seed all data"""
     seed_stores()
     seed_gifts()
+    commit_catalog_change()
     print("✅ All data seeded successfully!")
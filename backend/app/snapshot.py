@@ -0,0 +1,222 @@
+"""
+Pre-serialized public catalog
+Keeps the filter-free catalog listings (/stores, /gifts, /gifts?category=
+and /categories) as ready-made bytes, each with its compressed variants
+built once per catalog version, so serving them is a copy instead of a
+to_dict() + json.dumps() per row.
+
+Every row is serialized once into a JSON fragment. When the catalog
+version moves, the rows are re-read as plain tuples and only those that
+differ get re-serialized (a store change also re-serializes its gifts,
+which embed it). The rebuild runs on a background thread
+(CATALOG_SNAPSHOT_ASYNC) and the new state is swapped in when complete;
+until then requests use the live queries, so a stale listing is never
+served under the new version's ETag. Listings are joined from the
+fragments on first request. Per process, like the gift index; catalogs
+above CATALOG_SNAPSHOT_MAX_GIFTS are served by the live queries instead.
+"""
+import logging
+import threading
+from types import SimpleNamespace
+from typing import Dict, Iterable, Optional, Set
+
+from flask import current_app
+from sqlalchemy import func, select
+
+from .catalog import catalog_version
+from .compression import Precompressed
+from .models import db, Store, Gift
+
+logger = logging.getLogger(__name__)
+
+
+class _StoreRow(SimpleNamespace):
+    to_dict = Store.to_dict
+
+
+class _GiftRow(SimpleNamespace):
+    to_dict = Gift.to_dict
+
+
+class CatalogSnapshot:
+    """Row fragments plus lazily joined listing bodies of one catalog version."""
+
+    def __init__(self, compress_level: int):
+        self.compress_level = compress_level
+        self.version: Optional[int] = None
+        self.oversized = False
+        self._lock = threading.Lock()  # the published state below
+        self._refresh_lock = threading.Lock()  # one rebuild at a time
+        self._builder: Optional[threading.Thread] = None
+        self._store_rows: Dict[int, tuple] = {}
+        self._gift_rows: Dict[int, tuple] = {}
+        self._stores: Dict[int, bytes] = {}
+        self._gifts: Dict[int, bytes] = {}
+        self._gift_category: Dict[int, str] = {}
+        self._bodies: Dict[str, Precompressed] = {}
+
+    # ---------------- refresh ----------------
+    def refresh(self, version: int, max_gifts: int) -> Dict[str, int]:
+        """
+        Bring the fragments up to ``version`` (inside an app context);
+        returns what was re-serialized. Readers keep the previous state
+        until the new one is swapped in.
+        """
+        with self._refresh_lock:
+            if self.version == version:
+                return {'stores': 0, 'gifts': 0}
+            gifts = db.session.execute(select(func.count(Gift.id))).scalar()
+            if gifts > max_gifts:
+                self.clear(version)
+                return {'stores': 0, 'gifts': 0}
+            return self._refresh(version)
+
+    def refresh_in_background(self, app, version: int, max_gifts: int) -> None:
+        """Start refresh() on a thread unless one is already running."""
+        with self._lock:
+            if self._builder is not None and self._builder.is_alive():
+                return
+            self._builder = threading.Thread(target=self._build, args=(app, version, max_gifts),
+                                             name='catalog-snapshot', daemon=True)
+            self._builder.start()
+
+    def _build(self, app, version: int, max_gifts: int) -> None:
+        with app.app_context():
+            try:
+                self.refresh(version, max_gifts)
+            except Exception:
+                logger.exception("Catalog snapshot refresh to version %s failed", version)
+            finally:
+                db.session.remove()
+
+    def _refresh(self, version: int) -> Dict[str, int]:
+        dumpb = current_app.json.dumpb
+        store_rows = {row[0]: tuple(row) for row in db.session.execute(
+            select(Store.__table__).order_by(Store.id))}
+        gift_rows = {row[0]: tuple(row) for row in db.session.execute(
+            select(Gift.__table__).order_by(Gift.id))}
+        store_keys = Store.__table__.columns.keys()
+        gift_keys = Gift.__table__.columns.keys()
+
+        changed_stores = _changed(self._store_rows, store_rows)
+        changed_gifts = _changed(self._gift_rows, gift_rows)
+        if changed_stores:
+            # Gifts embed their store, so they change with it
+            store_pos = gift_keys.index('store_id')
+            changed_gifts |= {gid for gid, row in gift_rows.items() if row[store_pos] in changed_stores}
+
+        # Work on copies: readers render from the published dicts meanwhile
+        stores, gifts = dict(self._stores), dict(self._gifts)
+        gift_category = dict(self._gift_category)
+
+        store_objects = {}
+        for sid in changed_stores & store_rows.keys():
+            store_objects[sid] = _StoreRow(**dict(zip(store_keys, store_rows[sid])))
+            stores[sid] = dumpb(store_objects[sid].to_dict())
+        for sid in changed_stores - store_rows.keys():
+            del stores[sid]
+
+        dirty = {'categories'} if changed_gifts else set()
+        if changed_stores:
+            dirty.add('stores')
+        for gid in changed_gifts:
+            old_category = gift_category.pop(gid, None)
+            if old_category is not None:
+                dirty.add('gifts:' + old_category)
+            row = gift_rows.get(gid)
+            if row is None:
+                del gifts[gid]
+                continue
+            values = dict(zip(gift_keys, row))
+            store_id = values['store_id']
+            if store_id not in store_objects and store_id in store_rows:
+                store_objects[store_id] = _StoreRow(**dict(zip(store_keys, store_rows[store_id])))
+            gift = _GiftRow(**values, store=store_objects.get(store_id))
+            gifts[gid] = dumpb(gift.to_dict())
+            gift_category[gid] = values['category']
+            dirty.add('gifts:' + values['category'])
+        if changed_gifts:
+            dirty.add('gifts')
+
+        with self._lock:
+            self._store_rows, self._gift_rows = store_rows, gift_rows
+            self._stores, self._gifts, self._gift_category = stores, gifts, gift_category
+            self._bodies = {key: body for key, body in self._bodies.items() if key not in dirty}
+            self.oversized = False
+            self.version = version
+        return {'stores': len(changed_stores), 'gifts': len(changed_gifts)}
+
+    def clear(self, version: int) -> None:
+        """Drop everything (the catalog outgrew the snapshot)."""
+        with self._lock:
+            self._store_rows, self._gift_rows = {}, {}
+            self._stores, self._gifts, self._gift_category = {}, {}, {}
+            self._bodies = {}
+            self.oversized = True
+            self.version = version
+
+    # ---------------- bodies ----------------
+    def body(self, key: str) -> Optional[Precompressed]:
+        """
+        Listing body for 'stores', 'gifts', 'gifts:<category>' or
+        'categories'; None for a category without gifts.
+        """
+        with self._lock:
+            body = self._bodies.get(key)
+            if body is None:
+                body = self._render(key)
+                if body is not None:
+                    self._bodies[key] = body
+        return body
+
+    def _render(self, key: str) -> Optional[Precompressed]:
+        if key == 'stores':
+            raw = _join(self._stores[sid] for sid in sorted(self._stores))
+        elif key == 'gifts':
+            raw = _join(self._gifts[gid] for gid in sorted(self._gifts))
+        elif key == 'categories':
+            raw = current_app.json.dumpb(sorted(set(self._gift_category.values()))) + b"\n"
+        else:
+            category = key.split(':', 1)[1]
+            ids = sorted(gid for gid, c in self._gift_category.items() if c == category)
+            if not ids:
+                return None
+            raw = _join(self._gifts[gid] for gid in ids)
+        return Precompressed(raw, self.compress_level)
+
+
+def _changed(old: Dict[int, tuple], new: Dict[int, tuple]) -> Set[int]:
+    """Ids added, removed or with different column values."""
+    changed = old.keys() ^ new.keys()
+    changed.update(id_ for id_, row in new.items() if id_ in old and old[id_] != row)
+    return changed
+
+
+def _join(fragments: Iterable[bytes]) -> bytes:
+    return b"[" + b",".join(fragments) + b"]\n"
+
+
+# ================== PROCESS-LOCAL INSTANCE ==================
+def init_snapshot(app) -> None:
+    if app.config.get('CATALOG_SNAPSHOT'):
+        app.extensions['catalog_snapshot'] = CatalogSnapshot(app.config['COMPRESSION_STATIC_LEVEL'])
+
+
+def get_snapshot() -> Optional[CatalogSnapshot]:
+    """
+    The snapshot at the current catalog version, or None when disabled, too
+    large to keep pre-rendered, or still being rebuilt for a new version.
+    """
+    snapshot = current_app.extensions.get('catalog_snapshot')
+    if snapshot is None:
+        return None
+    version = catalog_version()
+    if snapshot.version != version:
+        max_gifts = current_app.config['CATALOG_SNAPSHOT_MAX_GIFTS']
+        if current_app.config['CATALOG_SNAPSHOT_ASYNC']:
+            snapshot.refresh_in_background(current_app._get_current_object(), version, max_gifts)
+            return None
+        snapshot.refresh(version, max_gifts)
+    if snapshot.version != version or snapshot.oversized:
+        return None
+    return snapshot
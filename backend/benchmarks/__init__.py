@@ -0,0 +1,6 @@
+"""
+Benchmarks for the Gift Finder backend
+Run from the backend directory, e.g. ``python -m benchmarks.bench_scoring``.
+``python -m benchmarks.suite`` runs the full suite on a synthetic catalog
+(up to 1M gifts / 10k stores) and writes JSON results for comparison.
+"""
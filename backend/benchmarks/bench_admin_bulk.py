@@ -0,0 +1,76 @@
+"""
+PATCH /admin/gifts/bulk vs the same updates as single PUT /admin/gifts/<id>
+
+    python -m benchmarks.bench_admin_bulk [--gifts 50000] [--items 1000]
+
+Re-prices ``--items`` gifts of a synthetic catalog both ways and reports
+the wall time and how many catalog versions (gift index rebuilds and
+result cache invalidations) each approach caused.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from app.catalog import catalog_version
+from app.models import db, Gift
+from benchmarks.harness import build_app, dispose_app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--gifts', type=int, default=50_000)
+    parser.add_argument('--items', type=int, default=1_000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    ids = rng.sample(range(1, args.gifts + 1), args.items)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = build_app(os.path.join(tmp, 'bench.db'), args.gifts)
+        app.config['ADMIN_BULK_MAX'] = max(app.config['ADMIN_BULK_MAX'], args.items)
+        client = app.test_client()
+        token = client.post('/api/v1/admin/login',
+                            json={'username': 'admin', 'password': 'admin123'}).get_json()['token']
+        headers = {'Authorization': f'Bearer {token}'}
+
+        def version():
+            with app.app_context():
+                app.extensions.pop('catalog_state', None)
+                return catalog_version()
+
+        before = version()
+        start = time.perf_counter()
+        for id_ in ids:
+            response = client.put(f'/api/v1/admin/gifts/{id_}', json={'max_budget': 111.0},
+                                  headers=headers)
+            assert response.status_code == 200, response.get_data(as_text=True)
+        single_time = time.perf_counter() - start
+        single_versions = version() - before
+
+        before = version()
+        start = time.perf_counter()
+        response = client.patch('/api/v1/admin/gifts/bulk', headers=headers,
+                                json=[{'id': id_, 'max_budget': 222.0} for id_ in ids])
+        bulk_time = time.perf_counter() - start
+        bulk_versions = version() - before
+
+        result = response.get_json()
+        assert response.status_code == 200 and result['succeeded'] == len(ids), result
+        with app.app_context():
+            updated = db.session.query(Gift).filter(Gift.id.in_(ids), Gift.max_budget == 222.0).count()
+        assert updated == len(ids), updated
+
+        print(f"gifts: {args.gifts}, updates: {len(ids)}")
+        print(f"single PUTs: {single_time:.2f} s ({len(ids) / single_time:.0f} items/s, "
+              f"{single_versions} catalog versions)")
+        print(f"bulk PATCH:  {bulk_time:.2f} s ({len(ids) / bulk_time:.0f} items/s, "
+              f"{bulk_versions} catalog version, {single_time / bulk_time:.1f}x)")
+
+        dispose_app(app)
+
+
+if __name__ == '__main__':
+    main()
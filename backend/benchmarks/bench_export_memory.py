@@ -0,0 +1,50 @@
+"""
+Peak memory of /admin/gifts: buffered JSON vs streaming exports
+
+    python -m benchmarks.bench_export_memory [--sizes 1000 10000 100000 1000000]
+
+Each size gets a fresh temporary SQLite database. Peak Python heap usage
+(tracemalloc) is measured while the full response body is consumed.
+"""
+import argparse
+import os
+import tempfile
+import tracemalloc
+
+from benchmarks.harness import build_app, dispose_app
+
+
+def peak_mb(client, url: str, headers: dict) -> float:
+    tracemalloc.start()
+    response = client.get(url, headers=headers, buffered=False)
+    for _ in response.iter_encoded():
+        pass
+    response.close()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    args = parser.parse_args()
+
+    print(f"{'gifts':>10} {'buffered MB':>12} {'ndjson MB':>10} {'stream MB':>10}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            app = build_app(os.path.join(tmp, 'bench.db'), size)
+            client = app.test_client()
+            token = client.post('/api/v1/admin/login',
+                                json={'username': 'admin', 'password': 'admin123'}).get_json()['token']
+            headers = {'Authorization': f'Bearer {token}'}
+
+            buffered = peak_mb(client, '/api/v1/admin/gifts', headers)
+            ndjson = peak_mb(client, '/api/v1/admin/gifts?format=ndjson', headers)
+            stream = peak_mb(client, '/api/v1/admin/gifts?format=stream', headers)
+            print(f"{size:>10} {buffered:>12.1f} {ndjson:>10.1f} {stream:>10.1f}")
+            dispose_app(app)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Bulk import throughput (run.py import-data / POST /admin/gifts/import)
+
+    python -m benchmarks.bench_import [--gifts 500000] [--stores 1000] [--format csv]
+
+Writes a synthetic catalog file, imports it into a fresh temporary SQLite
+database, then imports it again to time the pure de-duplication path.
+"""
+import argparse
+import csv
+import json
+import os
+import tempfile
+import time
+
+from app.importer import import_stream
+from app.models import Gift, Store
+from benchmarks.harness import build_app, dispose_app
+from benchmarks.synthetic import gift_records, store_records
+
+
+def write_file(path: str, fmt: str, records) -> None:
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = None
+        for batch in records:
+            for record in batch:
+                record = dict(record)
+                record.pop('id', None)
+                if fmt == 'ndjson':
+                    f.write(json.dumps(record, ensure_ascii=False) + '\n')
+                    continue
+                if 'interests' in record:
+                    record['interests'] = '|'.join(record['interests'])
+                if writer is None:
+                    writer = csv.DictWriter(f, fieldnames=list(record))
+                    writer.writeheader()
+                writer.writerow(record)
+
+
+def timed_import(app, model, path: str, fmt: str):
+    with app.app_context(), open(path, encoding='utf-8', newline='') as f:
+        start = time.perf_counter()
+        result = import_stream(model, f, fmt)
+        return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--gifts', type=int, default=500_000)
+    parser.add_argument('--stores', type=int, default=1_000)
+    parser.add_argument('--format', choices=['csv', 'ndjson'], default='csv')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        stores_path = os.path.join(tmp, f'stores.{args.format}')
+        gifts_path = os.path.join(tmp, f'gifts.{args.format}')
+        write_file(stores_path, args.format, [store_records(args.stores)])
+        write_file(gifts_path, args.format, gift_records(args.gifts, args.stores))
+
+        app = build_app(os.path.join(tmp, 'bench.db'), gifts=0, stores=0)
+        seconds, result = timed_import(app, Store, stores_path, args.format)
+        print(f"stores: {result['inserted']} inserted in {seconds:.2f} s")
+
+        seconds, result = timed_import(app, Gift, gifts_path, args.format)
+        assert result['inserted'] == args.gifts and not result['invalid'], result
+        print(f"gifts:  {result['inserted']} inserted in {seconds:.2f} s "
+              f"({result['inserted'] / seconds:,.0f} rows/s)")
+
+        seconds, result = timed_import(app, Gift, gifts_path, args.format)
+        assert result['skipped'] == args.gifts and not result['inserted'], result
+        print(f"re-import: {result['skipped']} duplicates skipped in {seconds:.2f} s")
+        dispose_app(app)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+JSON encoders on the seeded and a synthetic catalog
+
+    python -m benchmarks.bench_json [--gifts 20000] [--stores 200] [--rounds 20]
+
+Compares Flask's stock provider (stdlib json, ensure_ascii) with
+FastJSONProvider on every installed backend (orjson, ujson, json):
+  - encode:   app.json.dumps() of every gift's to_dict(), i.e. the body of
+              an unpaginated /gifts or /admin/gifts
+  - endpoint: GET /api/v1/admin/gifts?limit=500 through the test client
+              (query + to_dict + encode)
+for the seeded demo catalog (seed_data.py) and a synthetic one.
+"""
+import argparse
+import os
+import tempfile
+
+from flask.json.provider import DefaultJSONProvider
+
+from app import create_app
+from app.json_provider import BACKENDS, PREFERENCE, FastJSONProvider
+from app.models import Gift
+from app.routes import gift_query
+from app.seed_data import seed_all_data
+from benchmarks.harness import build_app, dispose_app, measure
+from config import TestingConfig
+
+
+def providers(app):
+    stock = DefaultJSONProvider(app)
+    yield 'flask default', stock
+    for name in PREFERENCE:
+        if name in BACKENDS:
+            yield name, FastJSONProvider(app, name)
+
+
+def run(label: str, app, rounds: int) -> None:
+    client = app.test_client()
+    with app.app_context():
+        payload = [gift.to_dict() for gift in gift_query().order_by(Gift.id).all()]
+        token = client.post('/api/v1/admin/login', json={
+            'username': 'admin', 'password': 'admin123'}).get_json()['token']
+    headers = {'Authorization': f'Bearer {token}'}
+    url = '/api/v1/admin/gifts?limit=500'
+
+    print(f"\n{label}: {len(payload)} gifts")
+    print(f"{'encoder':<14} {'encode ms':>10} {'bytes':>12} {'endpoint ms':>12}")
+    default = app.json
+    for name, provider in providers(app):
+        app.json = provider
+        with app.app_context():
+            # The stock provider needs the separators jsonify() passes it
+            dumps = (lambda: provider.dumps(payload, separators=(',', ':'))) \
+                if isinstance(provider, DefaultJSONProvider) else (lambda: provider.dumps(payload))
+            size = len(dumps().encode())
+            encode = measure(dumps, rounds, max_time=30)
+        assert client.get(url, headers=headers).status_code == 200
+        endpoint = measure(lambda: client.get(url, headers=headers), rounds)
+        print(f"{name:<14} {encode['median'] * 1000:>10.2f} {size:>12,} "
+              f"{endpoint['median'] * 1000:>12.2f}")
+    app.json = default
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--gifts', type=int, default=20_000)
+    parser.add_argument('--stores', type=int, default=200)
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args()
+
+    settings = dict(RECOMMEND_CACHE_BACKEND='none', COMPRESSION_ENABLED=False)
+
+    app = create_app(type('BenchConfig', (TestingConfig,), settings))
+    with app.app_context():
+        seed_all_data()
+    run('seeded catalog', app, args.rounds)
+    dispose_app(app)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = build_app(os.path.join(tmp, 'bench.db'), args.gifts, args.stores,
+                        HISTORY_ASYNC=False, **settings)
+        run('synthetic catalog', app, args.rounds)
+        dispose_app(app)
+
+
+if __name__ == '__main__':
+    main()
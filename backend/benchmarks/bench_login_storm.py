@@ -0,0 +1,153 @@
+"""
+Public latency during an admin login storm
+
+    python -m benchmarks.bench_login_storm [--gifts 20000] [--seconds 8] [--attackers 8]
+
+Serves the app from a threaded werkzeug server (like a gunicorn gthread
+worker) and measures POST /gifts/recommend latency from one client while
+``--attackers`` threads post wrong passwords to /admin/login, spread over
+``--admins`` existing usernames. Scenarios:
+  - baseline:     no storm
+  - unguarded:    passwords checked inline on the request threads, no rate limit
+  - pool only:    bounded verification pool, no rate limit
+  - guarded:      bounded pool plus per-username rate limiting (the defaults)
+  - no-hash storm: the same request rate against unknown usernames, i.e. the
+                  cost of the storm's HTTP traffic alone (the floor for
+                  "guarded" when attackers and server share the CPUs)
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+from app.instrumentation import percentiles
+from app.login import LoginGuard
+from app.models import db, Admin
+from benchmarks.harness import build_app, dispose_app
+from benchmarks.synthetic import criteria
+
+
+def post(url: str, payload) -> int:
+    request = urllib.request.Request(url, data=json.dumps(payload).encode(),
+                                     headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as e:
+        e.read()
+        return e.code
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+def storm(base: str, attackers: int, usernames, stop, statuses) -> None:
+    """Attacker process: ``attackers`` threads posting wrong passwords until ``stop``."""
+    counts = Counter()
+
+    def attacker(n):
+        i = n
+        while not stop.is_set():
+            counts[post(f'{base}/admin/login',
+                        {'username': usernames[i % len(usernames)], 'password': 'wrong'})] += 1
+            i += attackers
+
+    threads = [threading.Thread(target=attacker, args=(n,)) for n in range(attackers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    statuses.update(counts)
+
+
+def run(app, base: str, samples, args, guard: LoginGuard = None, prefix: str = 'admin'):
+    # Attackers live in another process so their client-side work does not
+    # compete with the measuring client for the GIL
+    ctx = multiprocessing.get_context('spawn')
+    stop = ctx.Event()
+    statuses = ctx.Manager().dict()
+    attackers = None
+    if guard is not None:
+        app.extensions['login_guard'] = guard
+        usernames = [f'{prefix}{n}' for n in range(args.admins)]
+        attackers = ctx.Process(target=storm, args=(base, args.attackers, usernames, stop, statuses))
+        attackers.start()
+        time.sleep(1)  # let the storm ramp up
+
+    latencies = []
+    deadline = time.perf_counter() + args.seconds
+    i = 0
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        assert post(f'{base}/gifts/recommend', samples[i % len(samples)]) == 200
+        latencies.append((time.perf_counter() - start) * 1000)
+        i += 1
+
+    stop.set()
+    if attackers is not None:
+        attackers.join()
+    return percentiles(latencies), len(latencies), dict(statuses)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--gifts', type=int, default=20_000)
+    parser.add_argument('--seconds', type=float, default=8)
+    parser.add_argument('--attackers', type=int, default=8)
+    parser.add_argument('--admins', type=int, default=50)
+    args = parser.parse_args()
+
+    samples = criteria(200)
+    with tempfile.TemporaryDirectory() as tmp:
+        app = build_app(os.path.join(tmp, 'bench.db'), args.gifts, HISTORY_ASYNC=False)
+        app.extensions.pop('recommend_cache', None)
+        with app.app_context():
+            template = Admin(username='template')
+            template.set_password('correct horse', app.config['PASSWORD_HASH_METHOD'])
+            db.session.add_all([Admin(username=f'admin{n}', password_hash=template.password_hash)
+                                for n in range(args.admins)])
+            db.session.commit()
+
+        server = make_server('127.0.0.1', 0, app, threaded=True,
+                             request_handler=QuietHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f'http://127.0.0.1:{server.server_port}/api/v1'
+        post(f'{base}/gifts/recommend', samples[0])  # build the gift index
+
+        config = app.config
+        pool = (config['LOGIN_WORKERS'], config['LOGIN_QUEUE'])
+        guarded = lambda: LoginGuard(*pool, config['LOGIN_RATE_LIMIT'], config['LOGIN_RATE_WINDOW'],
+                                     config['LOGIN_TIMEOUT'], config['LOGIN_WORKER_NICE'])
+        scenarios = [
+            ('baseline', None, 'admin'),
+            ('unguarded', LoginGuard(0, 0, 0, 0, config['LOGIN_TIMEOUT']), 'admin'),
+            ('pool only', LoginGuard(*pool, 0, 0, config['LOGIN_TIMEOUT'],
+                                     config['LOGIN_WORKER_NICE']), 'admin'),
+            ('guarded', guarded(), 'admin'),
+            ('no-hash storm', guarded(), 'nobody'),
+        ]
+        print(f"gifts: {args.gifts}, attackers: {args.attackers}, usernames: {args.admins}, "
+              f"cpus: {os.cpu_count()}")
+        for name, guard, prefix in scenarios:
+            stats, count, statuses = run(app, base, samples, args, guard, prefix)
+            print(f"{name:<13} recommend p50 {stats['p50']:>8.1f} ms  p99 {stats['p99']:>8.1f} ms "
+                  f"({count} requests)  login statuses {statuses}")
+
+        server.shutdown()
+        dispose_app(app)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Serial vs process-pool parallel scoring: where is the crossover?
+
+    python -m benchmarks.bench_parallel [--sizes 10000 100000 1000000] [--workers 4]
+
+For each catalog size the same criteria are ranked serially and through a
+ParallelScorer (shared-memory shards, local top-k, exact merge); results
+are checked for equality. Parallel only pays off once a shard's scoring
+time outweighs the per-request task round trips, and only with free cores.
+"""
+import argparse
+import os
+import time
+
+from app.gift_index import GiftIndex
+from app.parallel import ParallelScorer
+from app.recommendation import rank_index
+from benchmarks.synthetic import criteria, gift_rows
+
+
+def per_request_ms(index, samples, limit, scorer=None) -> float:
+    start = time.perf_counter()
+    for item in samples:
+        rank_index(index, item, limit, scorer=scorer)
+    return (time.perf_counter() - start) / len(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 300_000, 1_000_000])
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--criteria', type=int, default=50)
+    parser.add_argument('--limit', type=int, default=4)
+    args = parser.parse_args()
+
+    samples = criteria(args.criteria)
+    scorer = ParallelScorer(args.workers, shards=args.workers, min_gifts=0)
+
+    print(f"workers: {args.workers} (cpus: {os.cpu_count()})")
+    print(f"{'gifts':>10} {'serial ms':>10} {'parallel ms':>12} {'speedup':>8}")
+    try:
+        for size in args.sizes:
+            index = GiftIndex(gift_rows(size))
+            for item in samples:
+                serial = [(g.id, s, d) for g, s, d in rank_index(index, item, args.limit)]
+                parallel = [(g.id, s, d) for g, s, d in rank_index(index, item, args.limit, scorer=scorer)]
+                assert serial == parallel, item  # also warms the pool and shared memory
+
+            serial_ms = per_request_ms(index, samples, args.limit)
+            parallel_ms = per_request_ms(index, samples, args.limit, scorer)
+            print(f"{size:>10} {serial_ms:>10.2f} {parallel_ms:>12.2f} {serial_ms / parallel_ms:>7.2f}x")
+    finally:
+        scorer.close()
+
+
+if __name__ == '__main__':
+    main()
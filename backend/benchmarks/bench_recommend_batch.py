@@ -0,0 +1,59 @@
+"""
+POST /gifts/recommend/batch vs the same number of single /gifts/recommend calls
+
+    python -m benchmarks.bench_recommend_batch [--gifts 50000] [--criteria 1000]
+
+Both run against the same temporary SQLite catalog with the result cache
+disabled, so every criterion is actually ranked. The batch responses are
+checked against the single responses before timing.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.harness import build_app, dispose_app
+from benchmarks.synthetic import criteria
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--gifts', type=int, default=50_000)
+    parser.add_argument('--criteria', type=int, default=1_000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    samples = criteria(args.criteria, seed=args.seed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = build_app(os.path.join(tmp, 'bench.db'), args.gifts)
+        app.extensions.pop('recommend_cache', None)
+        app.config['RECOMMEND_BATCH_MAX'] = max(app.config['RECOMMEND_BATCH_MAX'], len(samples))
+        client = app.test_client()
+
+        # Warm the gift index so neither side pays for building it
+        client.post('/api/v1/gifts/recommend', json=samples[0])
+
+        start = time.perf_counter()
+        singles = [client.post('/api/v1/gifts/recommend', json=item).get_json() for item in samples]
+        single_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        response = client.post('/api/v1/gifts/recommend/batch', json=samples)
+        batch_time = time.perf_counter() - start
+
+        assert response.status_code == 200, response.get_data(as_text=True)
+        assert response.get_json() == singles, "batch results differ from single calls"
+        assert any(singles), "no recommendations at all; is the catalog empty?"
+        print(f"✅ Batch results == single results for {len(samples)} criteria")
+
+        print(f"gifts: {args.gifts}, criteria: {len(samples)}")
+        print(f"single calls: {single_time:.2f} s ({len(samples) / single_time:.0f} criteria/s)")
+        print(f"batch call:   {batch_time:.2f} s ({len(samples) / batch_time:.0f} criteria/s, "
+              f"{single_time / batch_time:.1f}x)")
+
+        dispose_app(app)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""
+Scalar smart_score vs vectorized score_batch
+
+    python -m benchmarks.bench_scoring [--sizes 10000 100000 1000000]
+
+Timing only: parity between the two paths is covered by
+tests/test_scoring_parity.py.
+"""
+import argparse
+import time
+
+from app.gift_index import GiftIndex
+from app.recommendation import score_batch, smart_score
+from benchmarks.synthetic import criteria, gift_rows
+
+
+def best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    item = criteria(1)[0]
+
+    print(f"{'gifts':>10} {'scalar (s)':>12} {'batch (s)':>12} {'speedup':>9}")
+    for size in args.sizes:
+        index = GiftIndex(gift_rows(size))
+        views = list(index.gifts())
+        scalar = best_of(lambda: [smart_score(g, item) for g in views], 1 if size > 100_000 else args.repeat)
+        batch = best_of(lambda: score_batch(index, item), args.repeat)
+        print(f"{size:>10} {scalar:>12.4f} {batch:>12.4f} {scalar / batch:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""
+Worker boot time
+
+    python -m benchmarks.bench_worker_boot [--workers 4] [--gifts 20000]
+
+Starts ``--workers`` app processes at once, the way gunicorn does, and
+reports per-worker boot time (import + create_app()), the wall time until
+all of them are ready, and the SQL statements each ran while booting:
+  - spawn, DB_BOOTSTRAP=1:  every worker imports the app and bootstraps the
+                            schema / default admin itself (on a fresh and on
+                            an already bootstrapped database)
+  - spawn, DB_BOOTSTRAP=0:  `run.py bootstrap` ran beforehand
+  - preload + fork:         gunicorn --preload (gunicorn.conf.py): the master
+                            builds the app once, workers are forked from it
+The fresh-database runs also show whether concurrent bootstraps collided.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from app.instrumentation import percentiles
+from benchmarks.harness import build_app, dispose_app
+
+# One worker: import + create_app(), counting SQL statements on the way
+WORKER = r"""
+import json, sys, time
+start = time.perf_counter()
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+statements = []
+event.listen(Engine, 'before_cursor_execute', lambda *args: statements.append(1))
+error = None
+try:
+    from app import create_app
+    create_app()
+except Exception as e:
+    error = f"{type(e).__name__}: {e}".splitlines()[0][:100]
+print(json.dumps({'boot': time.perf_counter() - start, 'statements': len(statements),
+                  'error': error}))
+"""
+
+# gunicorn --preload: build the app once, then fork the workers
+PRELOAD = r"""
+import json, os, sys, time
+start = time.perf_counter()
+from app import create_app, db
+app = create_app()
+built = time.perf_counter() - start
+results = []
+for _ in range(int(sys.argv[1])):
+    read, write = os.pipe()
+    forked = time.perf_counter()
+    if os.fork() == 0:
+        os.close(read)
+        with app.app_context():
+            db.engine.dispose(close=False)  # gunicorn.conf.py post_fork
+        os.write(write, str(time.perf_counter() - forked).encode())
+        os._exit(0)
+    os.close(write)
+    results.append(float(os.read(read, 64)))
+    os.close(read)
+    os.wait()
+print(json.dumps({'built': built, 'workers': results, 'total': time.perf_counter() - start}))
+"""
+
+
+def boot_workers(workers: int, env: dict):
+    start = time.perf_counter()
+    processes = [subprocess.Popen([sys.executable, '-c', WORKER], env=env, text=True,
+                                  stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+                 for _ in range(workers)]
+    results = [json.loads(process.communicate()[0].strip().splitlines()[-1])
+               for process in processes]
+    return results, time.perf_counter() - start
+
+
+def report(name: str, boots, total: float, statements=None, errors=()) -> None:
+    stats = percentiles([b * 1000 for b in boots])
+    line = (f"{name:<34} per worker p50 {stats['p50']:>7.1f} ms  max {max(boots) * 1000:>7.1f} ms  "
+            f"all ready {total * 1000:>7.1f} ms")
+    if statements is not None:
+        line += f"  sql/worker {statements}"
+    print(line)
+    for error in errors:
+        print(f"{'':<34} failed: {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--gifts', type=int, default=20_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog = os.path.join(tmp, 'catalog.db')
+        dispose_app(build_app(catalog, args.gifts))
+        base = dict(os.environ, PYTHONPATH=os.getcwd(), HISTORY_ASYNC='0')
+        print(f"workers: {args.workers}, gifts: {args.gifts}, cpus: {os.cpu_count()}")
+
+        for n, (name, database, bootstrap) in enumerate((
+            ('spawn, DB_BOOTSTRAP=1, fresh db', None, '1'),
+            ('spawn, DB_BOOTSTRAP=1', catalog, '1'),
+            ('spawn, DB_BOOTSTRAP=0', catalog, '0'),
+        )):
+            database = database or os.path.join(tmp, f'fresh{n}.db')
+            env = dict(base, DATABASE_URL='sqlite:///' + database, DB_BOOTSTRAP=bootstrap)
+            results, total = boot_workers(args.workers, env)
+            report(name, [r['boot'] for r in results], total,
+                   max(r['statements'] for r in results),
+                   [r['error'] for r in results if r['error']])
+
+        env = dict(base, DATABASE_URL='sqlite:///' + catalog, DB_BOOTSTRAP='0')
+        output = subprocess.run([sys.executable, '-c', PRELOAD, str(args.workers)], env=env,
+                                text=True, capture_output=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        report('preload + fork, DB_BOOTSTRAP=0', result['workers'], result['total'])
+        print(f"{'':<34} (master import + create_app {result['built'] * 1000:.1f} ms, once)")
+
+
+if __name__ == '__main__':
+    main()
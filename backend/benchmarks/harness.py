@@ -0,0 +1,126 @@
+"""
+Shared benchmark plumbing: synthetic apps, timing and JSON results
+"""
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import insert
+
+from app import create_app
+from app.catalog import commit_catalog_change
+from app.models import db, Gift, Store
+from benchmarks.synthetic import gift_records, store_records
+from config import Config
+
+
+def seed_catalog(gifts: int, stores: int, seed: int = 42) -> None:
+    """Bulk-insert a synthetic catalog (inside an app context)."""
+    if stores:
+        db.session.execute(insert(Store), store_records(stores, seed=seed))
+    for records in gift_records(gifts, stores, seed=seed):
+        db.session.execute(insert(Gift), records)
+    commit_catalog_change()
+
+
+def build_app(path: str, gifts: int, stores: int = 1, seed: int = 42, **config):
+    """A Flask app on a fresh SQLite file holding a synthetic catalog."""
+    # Snapshot refreshed in-request: benchmarks time the steady state
+    settings = dict({'CATALOG_SNAPSHOT_ASYNC': False}, **config,
+                    SQLALCHEMY_DATABASE_URI='sqlite:///' + path)
+    app = create_app(type('BenchConfig', (Config,), settings))
+    with app.app_context():
+        seed_catalog(gifts, stores, seed)
+    return app
+
+
+def dispose_app(app) -> None:
+    """Flush queued history rows and close connections before the DB goes away."""
+    writer = app.extensions.get('history_writer')
+    if writer is not None:
+        writer.close()
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+def measure(fn: Callable[[], Any], rounds: int = 20, warmup: int = 1,
+            max_time: Optional[float] = None) -> Dict[str, float]:
+    """
+    Run ``fn`` ``rounds`` times (after ``warmup`` untimed calls) and return
+    pytest-benchmark style statistics in seconds. Stops early once
+    ``max_time`` seconds have been spent timing.
+    """
+    for _ in range(warmup):
+        fn()
+    timings: List[float] = []
+    budget_start = time.perf_counter()
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+        if max_time is not None and time.perf_counter() - budget_start > max_time:
+            break
+    mean = statistics.fmean(timings)
+    return {
+        'min': min(timings),
+        'max': max(timings),
+        'mean': mean,
+        'median': statistics.median(timings),
+        'stddev': statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        'rounds': len(timings),
+        'ops': 1 / mean if mean else 0.0,
+    }
+
+
+def _commit_info() -> Dict[str, Any]:
+    def git(*args):
+        try:
+            return subprocess.run(['git', *args], capture_output=True, text=True,
+                                  check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+    return {
+        'id': git('rev-parse', 'HEAD'),
+        'branch': git('rev-parse', '--abbrev-ref', 'HEAD'),
+        'dirty': bool(git('status', '--porcelain', '--untracked-files=no')),
+    }
+
+
+def write_results(path: str, benchmarks: List[Dict[str, Any]], params: Dict[str, Any]) -> None:
+    """Write results in the layout of pytest-benchmark's --benchmark-json."""
+    payload = {
+        'machine_info': {
+            'node': platform.node(),
+            'machine': platform.machine(),
+            'python_version': platform.python_version(),
+            'cpu_count': os.cpu_count(),
+            'numpy_version': np.__version__,
+        },
+        'commit_info': _commit_info(),
+        'datetime': datetime.now(timezone.utc).isoformat(),
+        'params': params,
+        'benchmarks': benchmarks,
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, indent=2)
+
+
+def compare(old_path: str, benchmarks: List[Dict[str, Any]]) -> None:
+    """Print the median ratio of every benchmark against an earlier results file."""
+    with open(old_path, encoding='utf-8') as f:
+        old = {b['name']: b for b in json.load(f)['benchmarks']}
+    print(f"\n{'benchmark':<40} {'old ms':>10} {'new ms':>10} {'change':>8}")
+    for bench in benchmarks:
+        before = old.get(bench['name'])
+        if before is None:
+            continue
+        old_ms = before['stats']['median'] * 1000
+        new_ms = bench['stats']['median'] * 1000
+        print(f"{bench['name']:<40} {old_ms:>10.3f} {new_ms:>10.3f} {new_ms / old_ms - 1:>+8.1%}")
@@ -0,0 +1,135 @@
+"""
+Benchmark suite at production scale
+
+    python -m benchmarks.suite [--gifts 1000000] [--stores 10000]
+                               [--output results.json] [--compare old.json]
+                               [--only smart_score recommend_endpoint ...]
+
+Builds a synthetic catalog in a temporary SQLite file and times:
+  - smart_score / get_recommendations (scalar path, on --scalar-gifts gifts)
+  - rank_index (vectorized path, whole catalog)
+  - GET /gifts, GET /stores, POST /gifts/recommend via the Flask test client
+  - 304 revalidations of GET /gifts and GET /stores (If-None-Match)
+  - gzip responses: compressed per request vs precompressed snapshot listings
+  - bulk seeding of the catalog itself
+Results are written in pytest-benchmark's JSON layout; --compare prints the
+median change against an earlier results file.
+"""
+import argparse
+import itertools
+import os
+import tempfile
+import time
+
+from app.gift_index import get_gift_index
+from app.recommendation import get_recommendations, rank_index, smart_score
+from benchmarks.harness import build_app, compare, dispose_app, measure, write_results
+from benchmarks.synthetic import criteria
+
+SUITES = ('seed', 'smart_score', 'get_recommendations', 'rank_index',
+          'gifts_endpoint', 'stores_endpoint', 'recommend_endpoint', 'conditional_get',
+          'compression')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--gifts', type=int, default=100_000)
+    parser.add_argument('--stores', type=int, default=1_000)
+    parser.add_argument('--scalar-gifts', type=int, default=10_000,
+                        help='catalog slice used by the scalar smart_score suites')
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--only', nargs='+', choices=SUITES)
+    parser.add_argument('--output', default='benchmark-results.json')
+    parser.add_argument('--compare', metavar='OLD_JSON')
+    args = parser.parse_args()
+
+    selected = set(args.only or SUITES)
+    results = []
+
+    def record(name, group, stats, **params):
+        results.append({'name': name, 'group': group, 'params': params, 'stats': stats})
+        print(f"{name:<40} median {stats['median'] * 1000:>10.3f} ms "
+              f"({stats['rounds']} rounds, {stats['ops']:.1f} ops/s)")
+
+    samples = criteria(200, seed=args.seed)
+    cycle = itertools.cycle(samples)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        app = build_app(os.path.join(tmp, 'bench.db'), args.gifts, args.stores, args.seed)
+        seed_seconds = time.perf_counter() - start
+        if 'seed' in selected:
+            # One round: a fresh database per round would dominate the run time
+            record('seed_catalog', 'seed', {
+                'min': seed_seconds, 'max': seed_seconds, 'mean': seed_seconds,
+                'median': seed_seconds, 'stddev': 0.0, 'rounds': 1, 'ops': 1 / seed_seconds,
+            }, gifts=args.gifts, stores=args.stores)
+
+        # Measure the engine and handlers, not the result cache
+        app.extensions.pop('recommend_cache', None)
+        client = app.test_client()
+
+        with app.app_context():
+            index = get_gift_index()
+            views = list(itertools.islice(index.gifts(), args.scalar_gifts))
+
+            if 'smart_score' in selected:
+                item = samples[0]
+                stats = measure(lambda: [smart_score(g, item) for g in views], args.rounds, max_time=30)
+                record('smart_score', 'scoring', stats, gifts=len(views))
+            if 'get_recommendations' in selected:
+                stats = measure(lambda: get_recommendations(views, next(cycle)), args.rounds, max_time=30)
+                record('get_recommendations', 'scoring', stats, gifts=len(views))
+            if 'rank_index' in selected:
+                stats = measure(lambda: rank_index(index, next(cycle)), args.rounds * 5)
+                record('rank_index', 'scoring', stats, gifts=len(index))
+
+        if 'gifts_endpoint' in selected:
+            for name, url in (
+                ('gifts_page_50', '/api/v1/gifts?limit=50'),
+                ('gifts_page_500_deep', f'/api/v1/gifts?limit=500&after_id={args.gifts // 2}'),
+                ('gifts_category_page', '/api/v1/gifts?category=sports&max_budget=100&limit=50'),
+                ('gifts_category_all', '/api/v1/gifts?category=sports'),
+            ):
+                stats = measure(lambda: client.get(url), args.rounds * 5)
+                record(name, 'endpoints', stats, url=url)
+        if 'stores_endpoint' in selected:
+            for name, url in (('stores_page_50', '/api/v1/stores?limit=50'),
+                              ('stores_all', '/api/v1/stores')):
+                stats = measure(lambda: client.get(url), args.rounds * 5)
+                record(name, 'endpoints', stats, url=url)
+        if 'recommend_endpoint' in selected:
+            stats = measure(lambda: client.post('/api/v1/gifts/recommend', json=next(cycle)),
+                            args.rounds * 5)
+            record('recommend_endpoint', 'endpoints', stats, gifts=args.gifts)
+        if 'conditional_get' in selected:
+            for name, url in (('gifts_page_50_304', '/api/v1/gifts?limit=50'),
+                              ('stores_all_304', '/api/v1/stores')):
+                headers = {'If-None-Match': client.get(url).headers['ETag']}
+                stats = measure(lambda: client.get(url, headers=headers), args.rounds * 5)
+                record(name, 'endpoints', stats, url=url)
+        if 'compression' in selected:
+            gzip_headers = {'Accept-Encoding': 'gzip'}
+            for name, url in (('gifts_page_500_gzip', '/api/v1/gifts?limit=500'),
+                              ('gifts_category_all_gzip', '/api/v1/gifts?category=sports'),
+                              ('stores_all_gzip', '/api/v1/stores')):
+                identity = len(client.get(url).data)
+                encoded = len(client.get(url, headers=gzip_headers).data)
+                stats = measure(lambda: client.get(url, headers=gzip_headers), args.rounds * 5)
+                record(name, 'endpoints', stats, url=url, identity_bytes=identity,
+                       gzip_bytes=encoded, saved=round(1 - encoded / identity, 3))
+
+        dispose_app(app)
+
+    params = {'gifts': args.gifts, 'stores': args.stores, 'scalar_gifts': args.scalar_gifts,
+              'seed': args.seed}
+    write_results(args.output, results, params)
+    print(f"\nResults written to {args.output}")
+    if args.compare:
+        compare(args.compare, results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+Synthetic catalog data for benchmarks
+Distributions loosely follow the seeded catalog (see app/seed_data.py)
+"""
+import random
+from typing import Dict, Iterator, List, Tuple
+
+INTERESTS = [
+    'gaming', 'technology', 'music', 'comfort', 'beauty', 'fashion', 'self-care',
+    'style', 'sports', 'fitness', 'running', 'football', 'basketball', 'gym',
+    'anime', 'collectibles', 'home', 'decoration', 'work', 'study', 'writing',
+    'organization', 'experience', 'reading', 'books', 'puzzles', 'games',
+    'thinking', 'cooking', 'travel', 'art', 'photography', 'gardening', 'pets',
+    'movies', 'outdoors', 'crafts', 'coffee', 'perfume', 'jewelry',
+]
+OCCASIONS = ['any', 'birthday', 'graduation', 'wedding', 'housewarming',
+             'anniversary', 'eid', 'general', 'ramadan', 'new-baby']
+PERSONALITIES = ['gamer', 'athlete', 'fashionista', 'reader', 'adventurer',
+                 'collector', 'creative', 'music-lover', 'professional',
+                 'student', 'thinker', 'tech-savvy', 'foodie', 'homebody', '']
+GENDERS = ['unisex', 'unisex', 'unisex', 'female', 'male']
+CATEGORIES = ['gaming', 'sports', 'technology', 'fashion', 'home', 'beauty',
+              'reading', 'experience', 'study', 'collectibles', 'entertainment']
+
+
+def _weighted(rng: random.Random, values: List[str]) -> str:
+    # Zipf-like popularity: the first values are picked far more often
+    return values[min(int(rng.paretovariate(1.2)) - 1, len(values) - 1)]
+
+
+def gift_rows(n: int, seed: int = 42) -> List[Tuple]:
+    """Rows in the column order of gift_index.GiftIndex.COLUMNS."""
+    rng = random.Random(seed)
+    rows = []
+    for gift_id in range(1, n + 1):
+        min_age = rng.randint(3, 60)
+        min_budget = float(rng.choice([10, 15, 20, 30, 50, 80, 100, 150, 250, 500]))
+        interests = {_weighted(rng, INTERESTS) for _ in range(rng.randint(1, 4))}
+        rows.append((
+            gift_id,
+            min_age,
+            min_age + rng.randint(2, 40),
+            min_budget,
+            min_budget * rng.choice([1.5, 2, 3, 5]),
+            rng.choice(GENDERS),
+            _weighted(rng, OCCASIONS),
+            _weighted(rng, PERSONALITIES),
+            sorted(interests),
+        ))
+    return rows
+
+
+def store_records(n: int, seed: int = 42) -> List[Dict]:
+    """Store column values for ``insert(Store)``; ids run from 1 to n."""
+    rng = random.Random(seed)
+    return [
+        {
+            'id': store_id,
+            'name_ar': f'متجر {store_id}',
+            'name_en': f'Store {store_id}',
+            'location_url': f'https://maps.example.com/{store_id}',
+            'description_ar': 'متجر هدايا ' * rng.randint(1, 4),
+            'description_en': 'Gift store ' * rng.randint(1, 4),
+            'image_url': f'https://images.example.com/stores/{store_id}.jpg',
+        }
+        for store_id in range(1, n + 1)
+    ]
+
+
+def gift_records(n: int, stores: int, seed: int = 42, batch: int = 50_000) -> Iterator[List[Dict]]:
+    """
+    Gift column values for ``insert(Gift)`` in batches of ``batch`` rows.
+    Scoring fields come from gift_rows(); a few stores carry most of the
+    catalog, like the seeded data.
+    """
+    rng = random.Random(seed)
+    for start in range(0, n, batch):
+        records = []
+        for (gift_id, min_age, max_age, min_budget, max_budget, gender,
+             occasion, personality, interests) in gift_rows(min(batch, n - start), seed=seed + start):
+            gift_id += start
+            records.append({
+                'id': gift_id,
+                'store_id': int(stores * rng.random() ** 2) + 1,
+                'name_ar': f'هدية {gift_id}',
+                'name_en': f'Gift {gift_id}',
+                'category': _weighted(rng, CATEGORIES),
+                'min_age': min_age, 'max_age': max_age,
+                'min_budget': min_budget, 'max_budget': max_budget,
+                'gender': gender, 'occasion': occasion,
+                'personality_type': personality, 'interests': interests,
+                'description_ar': 'وصف الهدية ' * rng.randint(2, 8),
+                'description_en': 'Gift description ' * rng.randint(2, 8),
+                'image_url': f'https://images.example.com/gifts/{gift_id}.jpg',
+            })
+        yield records
+
+
+def criteria(n: int, seed: int = 7) -> List[dict]:
+    """Random recommendation criteria shaped like GiftForm submissions."""
+    rng = random.Random(seed)
+    result = []
+    for _ in range(n):
+        item = {
+            'age': rng.randint(1, 80),
+            'budget': rng.choice([5, 20, 50, 75.5, 100, 200, 400, 1000]),
+            'interests': rng.sample(INTERESTS, rng.randint(0, 4)),
+        }
+        if rng.random() < 0.7:
+            item['occasion'] = rng.choice(OCCASIONS + ['', 'Birthday '])
+        if rng.random() < 0.7:
+            item['personality_type'] = rng.choice(PERSONALITIES + ['tech', 'Gamer'])
+        result.append(item)
+    return result
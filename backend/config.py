@@ -18,6 +18,10 @@ class Config:
         'sqlite:///' + os.path.join(basedir, 'giftfinder.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Create tables and the default admin in create_app(). Set to 0 when
+    # `python run.py bootstrap` runs once before the workers start
+    DB_BOOTSTRAP = os.environ.get('DB_BOOTSTRAP', '1') == '1'
+    
     # Session configuration
     SESSION_TYPE = 'filesystem'
     SESSION_PERMANENT = True
@@ -36,6 +40,113 @@ class Config:
     # API configuration
     API_VERSION = 'v1'
     
+    # Keyset pagination for list endpoints (?after_id=&limit=)
+    PAGE_SIZE_DEFAULT = int(os.environ.get('PAGE_SIZE_DEFAULT', 50))
+    PAGE_SIZE_MAX = int(os.environ.get('PAGE_SIZE_MAX', 500))
+    
+    # Recommendations: score only coarse candidates (age/budget windows,
+    # interest overlap) and gifts whose score ceiling could still reach the top-k
+    RECOMMEND_PREFILTER = os.environ.get('RECOMMEND_PREFILTER', '0') == '1'
+    
+    # Parallel scoring: shard the gift index across a process pool for
+    # catalogs of at least RECOMMEND_PARALLEL_MIN_GIFTS gifts (0 workers = off).
+    # Shards default to one per worker.
+    RECOMMEND_PARALLEL_WORKERS = int(os.environ.get('RECOMMEND_PARALLEL_WORKERS', 0))
+    RECOMMEND_PARALLEL_SHARDS = int(os.environ.get('RECOMMEND_PARALLEL_SHARDS', 0))
+    RECOMMEND_PARALLEL_MIN_GIFTS = int(os.environ.get('RECOMMEND_PARALLEL_MIN_GIFTS', 200000))
+    
+    # Most criteria accepted by one POST /gifts/recommend/batch call
+    RECOMMEND_BATCH_MAX = int(os.environ.get('RECOMMEND_BATCH_MAX', 1000))
+    
+    # Recommendation result cache: memory (per process), sqlite (shared by
+    # the workers of one host) or none. Entries are keyed on the catalog
+    # version, which workers re-read every CATALOG_VERSION_POLL_SECONDS.
+    RECOMMEND_CACHE_BACKEND = os.environ.get('RECOMMEND_CACHE_BACKEND', 'memory')
+    RECOMMEND_CACHE_SIZE = int(os.environ.get('RECOMMEND_CACHE_SIZE', 2048))
+    RECOMMEND_CACHE_TTL = float(os.environ.get('RECOMMEND_CACHE_TTL', 300))
+    RECOMMEND_CACHE_PATH = os.environ.get('RECOMMEND_CACHE_PATH') or \
+        os.path.join(basedir, 'recommend_cache.db')
+    CATALOG_VERSION_POLL_SECONDS = float(os.environ.get('CATALOG_VERSION_POLL_SECONDS', 1.0))
+    
+    # Recommendation history: queued and bulk-inserted by a background thread
+    HISTORY_ASYNC = os.environ.get('HISTORY_ASYNC', '1') == '1'
+    HISTORY_QUEUE_SIZE = int(os.environ.get('HISTORY_QUEUE_SIZE', 10000))
+    HISTORY_FLUSH_ROWS = int(os.environ.get('HISTORY_FLUSH_ROWS', 500))
+    HISTORY_FLUSH_INTERVAL_MS = int(os.environ.get('HISTORY_FLUSH_INTERVAL_MS', 1000))
+    
+    # Request instrumentation: phase timings / SQL counts per request and
+    # rolling p50/p95/p99 over the last METRICS_WINDOW requests per endpoint
+    # (GET /admin/metrics). SERVER_TIMING also reports them to the client.
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') == '1'
+    METRICS_WINDOW = int(os.environ.get('METRICS_WINDOW', 2048))
+    SERVER_TIMING = os.environ.get('SERVER_TIMING', '1') == '1'
+    
+    # Admin JWTs: lifetime of tokens issued by /admin/login, size of the
+    # per-process verified-token cache (0 = off) and how often a cached token
+    # is re-checked against the admins table (the revocation window)
+    JWT_EXPIRES_SECONDS = int(os.environ.get('JWT_EXPIRES_SECONDS', 12 * 3600))
+    JWT_CACHE_SIZE = int(os.environ.get('JWT_CACHE_SIZE', 1024))
+    JWT_REVALIDATE_SECONDS = float(os.environ.get('JWT_REVALIDATE_SECONDS', 60))
+    
+    # Admin passwords: werkzeug hash method for new and upgraded hashes
+    # (e.g. 'scrypt:32768:8:1', 'pbkdf2:sha256:600000'). Hashes made with
+    # other parameters are re-hashed on the next successful login.
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    
+    # /admin/login: passwords are checked on LOGIN_WORKERS threads with up to
+    # LOGIN_QUEUE waiting (beyond that: 503; 0 workers = check inline), and
+    # each username gets LOGIN_RATE_LIMIT attempts per LOGIN_RATE_WINDOW
+    # seconds (0 = unlimited) before 429. Pool threads run at nice
+    # LOGIN_WORKER_NICE (Linux).
+    LOGIN_WORKERS = int(os.environ.get('LOGIN_WORKERS', 1))
+    LOGIN_QUEUE = int(os.environ.get('LOGIN_QUEUE', 4))
+    LOGIN_TIMEOUT = float(os.environ.get('LOGIN_TIMEOUT', 10))
+    LOGIN_RATE_LIMIT = int(os.environ.get('LOGIN_RATE_LIMIT', 5))
+    LOGIN_RATE_WINDOW = float(os.environ.get('LOGIN_RATE_WINDOW', 60))
+    LOGIN_WORKER_NICE = int(os.environ.get('LOGIN_WORKER_NICE', 10))
+    
+    # Public catalog reads (/stores, /gifts, /categories, ...): ETag and
+    # Last-Modified from the catalog version, 304 on revalidation, and these
+    # Cache-Control policies (empty = no header). /interests is static.
+    CONDITIONAL_GET = os.environ.get('CONDITIONAL_GET', '1') == '1'
+    CACHE_CONTROL_CATALOG = os.environ.get('CACHE_CONTROL_CATALOG',
+                                           'public, max-age=60, stale-while-revalidate=300')
+    CACHE_CONTROL_STATIC = os.environ.get('CACHE_CONTROL_STATIC', 'public, max-age=86400')
+    
+    # Pre-serialized (and precompressed) bodies of the filter-free public
+    # catalog listings, refreshed incrementally per catalog version (on a
+    # background thread with CATALOG_SNAPSHOT_ASYNC; live queries serve
+    # meanwhile). Off for catalogs larger than CATALOG_SNAPSHOT_MAX_GIFTS
+    # (memory per worker).
+    CATALOG_SNAPSHOT = os.environ.get('CATALOG_SNAPSHOT', '1') == '1'
+    CATALOG_SNAPSHOT_ASYNC = os.environ.get('CATALOG_SNAPSHOT_ASYNC', '1') == '1'
+    CATALOG_SNAPSHOT_MAX_GIFTS = int(os.environ.get('CATALOG_SNAPSHOT_MAX_GIFTS', 100000))
+    
+    # Response compression: codings in server preference order (br / zstd
+    # only when the brotli / zstandard packages are installed), bodies below
+    # COMPRESSION_MIN_SIZE bytes are sent as is. COMPRESSION_LEVEL applies per
+    # response, COMPRESSION_STATIC_LEVEL to snapshot listings (paid once per
+    # catalog version); clamped per codec (gzip 1-9, brotli 0-11, zstd 1-22).
+    COMPRESSION_ENABLED = os.environ.get('COMPRESSION_ENABLED', '1') == '1'
+    COMPRESSION_ENCODINGS = os.environ.get('COMPRESSION_ENCODINGS', 'br,zstd,gzip').split(',')
+    COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))
+    COMPRESSION_LEVEL = int(os.environ.get('COMPRESSION_LEVEL', 5))
+    COMPRESSION_STATIC_LEVEL = int(os.environ.get('COMPRESSION_STATIC_LEVEL', 6))
+    
+    # JSON encoder behind jsonify / request.get_json: orjson, ujson, json
+    # (stdlib) or auto (the first of those that is installed)
+    JSON_ENCODER = os.environ.get('JSON_ENCODER', 'auto')
+    
+    # Most items per POST/PATCH/DELETE /admin/<stores|gifts>/bulk call
+    ADMIN_BULK_MAX = int(os.environ.get('ADMIN_BULK_MAX', 5000))
+    
+    # Rows per executemany batch for bulk imports (run.py import-data,
+    # POST /admin/<stores|gifts>/import)
+    IMPORT_BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE', 5000))
+    
+    # Rows fetched per round trip when streaming exports (?format=ndjson|stream)
+    EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', 1000))
+    
     @staticmethod
     def init_app(app):
         pass
@@ -58,6 +169,9 @@ class TestingConfig(Config):
     """Testing configuration"""
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    HISTORY_ASYNC = False
+    CATALOG_SNAPSHOT_ASYNC = False
+    CATALOG_VERSION_POLL_SECONDS = 0
 
 
 config = {
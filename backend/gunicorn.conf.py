@@ -0,0 +1,28 @@
+"""
+Gunicorn settings
+
+    python run.py bootstrap && gunicorn -c gunicorn.conf.py 'app:create_app()'
+
+The app is imported and built once in the master (preload_app) and the
+workers are forked from it: a worker boots in milliseconds, shares the
+master's imported modules, and opens no database connection before its
+first request. Schema creation and the default admin are left to
+`run.py bootstrap` (DB_BOOTSTRAP=0 below), so workers do not race on it.
+"""
+import os
+
+os.environ.setdefault('DB_BOOTSTRAP', '0')
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('GUNICORN_WORKERS', 4))
+# Threaded workers keep serving public requests while one waits on the
+# admin login pool (see app/login.py)
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+preload_app = True
+
+
+def post_fork(server, worker):
+    # Connections opened in the master (e.g. DB_BOOTSTRAP=1) stay with it
+    from app import db
+    with server.app.wsgi().app_context():
+        db.engine.dispose(close=False)
@@ -3,8 +3,9 @@ Application entry point
 Run this file to start the Flask server
 """
 import sys
+import click
 from app import create_app, db
-from app.models import Store, Gift, Admin
+from app.models import Store, Gift, Admin, ensure_indexes
 
 app = create_app()
 
@@ -14,9 +15,25 @@ def init_db():
     """Initialize the database"""
     with app.app_context():
         db.create_all()
+        ensure_indexes()
         print("✅ Database initialized successfully!")
 
 
+def bootstrap_db():
+    """Create missing tables / indexes and the default admin (once per deployment)."""
+    from app.bootstrap import bootstrap_database
+    with app.app_context():
+        if bootstrap_database():
+            print("✅ Default admin created (username: admin, password: admin123)")
+        print("✅ Database bootstrapped!")
+
+
+@app.cli.command('bootstrap')
+def bootstrap():
+    """Create the schema and default admin before starting workers"""
+    bootstrap_db()
+
+
 @app.cli.command()
 def seed_db():
     """Seed database with sample data"""
@@ -26,6 +43,32 @@ def seed_db():
         print("✅ Database seeded successfully!")
 
 
+def import_file(kind, path, fmt=None, batch_size=None):
+    """Import stores or gifts from a CSV / NDJSON file in one transaction."""
+    from app.importer import detect_format, import_stream
+    fmt = fmt or detect_format(path)
+    if fmt is None:
+        print("❌ Unknown file format (use .csv / .ndjson or --format)")
+        return
+    model = Store if kind == 'stores' else Gift
+    with app.app_context(), open(path, encoding='utf-8-sig', newline='') as f:
+        result = import_stream(model, f, fmt, batch_size)
+    print(f"✅ Imported {result['inserted']} {kind} "
+          f"({result['skipped']} already present, {result['invalid']} invalid)")
+    for error in result['errors']:
+        print(f"   line {error['line']}: {error['error']}")
+
+
+@app.cli.command('import-data')
+@click.argument('kind', type=click.Choice(['stores', 'gifts']))
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'ndjson']), help='Defaults to the file extension')
+@click.option('--batch-size', type=int, help='Rows per insert batch (IMPORT_BATCH_SIZE)')
+def import_data(kind, path, fmt, batch_size):
+    """Bulk import stores or gifts from CSV / NDJSON"""
+    import_file(kind, path, fmt, batch_size)
+
+
 @app.cli.command()
 def create_admin():
     """Create a new admin user"""
@@ -38,7 +81,7 @@ def create_admin():
             return
         
         admin = Admin(username=username)
-        admin.set_password(password)
+        admin.set_password(password, app.config['PASSWORD_HASH_METHOD'])
         db.session.add(admin)
         db.session.commit()
         
@@ -50,12 +93,19 @@ if __name__ == '__main__':
         if sys.argv[1] == 'init-db':
             with app.app_context():
                 db.create_all()
+                ensure_indexes()
                 print("✅ Database initialized!")
+        elif sys.argv[1] == 'bootstrap':
+            # Once before `gunicorn -c gunicorn.conf.py`, which runs with DB_BOOTSTRAP=0
+            bootstrap_db()
         elif sys.argv[1] == 'seed-db':
             from app.seed_data import seed_all_data
             with app.app_context():
                 seed_all_data()
                 print("✅ Database seeded!")
+        elif sys.argv[1] == 'import-data' and len(sys.argv) >= 4:
+            # python run.py import-data <stores|gifts> <file.csv|file.ndjson>
+            import_file(sys.argv[2], sys.argv[3])
     else:
         # Run the application
         print("🚀 Starting Gift Finder Backend...")
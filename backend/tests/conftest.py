@@ -0,0 +1,53 @@
+"""
+Shared fixtures: apps on a fresh in-memory database with a small catalog
+"""
+import pytest
+
+from app import create_app
+from app.models import db, Store, Gift
+from config import TestingConfig
+
+CATEGORIES = ['gaming', 'sports', 'reading', 'technology']
+INTERESTS = ['gaming', 'sports', 'reading', 'technology', 'music', 'travel']
+
+
+def add_catalog(stores: int, gifts: int) -> None:
+    """``stores`` stores and ``gifts`` gifts spread across them (inside an app context)."""
+    store_rows = [Store(name_ar=f'متجر {n}', name_en=f'Store {n}',
+                        location_url=f'https://example.com/{n}') for n in range(stores)]
+    db.session.add_all(store_rows)
+    db.session.flush()
+    db.session.add_all(Gift(
+        store_id=store_rows[n % stores].id,
+        name_ar=f'هدية {n}',
+        name_en=f'Gift {n}',
+        category=CATEGORIES[n % len(CATEGORIES)],
+        min_age=5 + n % 20,
+        max_age=30 + n % 40,
+        min_budget=10.0 + n % 50,
+        max_budget=100.0 + n % 200,
+        gender='unisex',
+        occasion='birthday' if n % 2 else 'any',
+        personality_type='gamer' if n % 3 else 'reader',
+        interests=[INTERESTS[n % len(INTERESTS)], INTERESTS[(n + 2) % len(INTERESTS)]],
+    ) for n in range(gifts))
+    db.session.commit()
+
+
+@pytest.fixture
+def make_app():
+    """Factory: make_app(stores, gifts, **config) -> app with that catalog."""
+    apps = []
+
+    def make(stores: int, gifts: int, **config):
+        app = create_app(type('TestConfig', (TestingConfig,), config))
+        with app.app_context():
+            add_catalog(stores, gifts)
+        apps.append(app)
+        return app
+
+    yield make
+    for app in apps:
+        with app.app_context():
+            db.session.remove()
+            db.engine.dispose()
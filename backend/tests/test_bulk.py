@@ -0,0 +1,26 @@
+"""
+Bulk admin changes are visible to the worker that made them right away,
+not only after its next catalog version poll.
+"""
+from app.auth import issue_admin_token
+from app.models import Admin
+
+CRITERIA = {'age': 20, 'budget': 150, 'interests': ['gaming']}
+
+
+def test_bulk_update_refreshes_recommendations(make_app):
+    app = make_app(1, 4, CATALOG_VERSION_POLL_SECONDS=30)
+    client = app.test_client()
+    with app.app_context():
+        headers = {'Authorization': f'Bearer {issue_admin_token(Admin.query.first())}'}
+
+    before = client.post('/api/v1/gifts/recommend', json=CRITERIA).get_json()
+    top = before[0]['gift']
+    response = client.patch('/api/v1/admin/gifts/bulk', headers=headers, json=[
+        {'id': top['id'], 'min_budget': 5000.0, 'max_budget': 9000.0}])
+    assert response.get_json()['succeeded'] == 1
+
+    after = client.post('/api/v1/gifts/recommend', json=CRITERIA).get_json()
+    updated = [r for r in after if r['gift']['id'] == top['id']]
+    assert all(r['gift']['max_budget'] == 9000.0 for r in updated)
+    assert all(r['score'] < before[0]['score'] for r in updated)
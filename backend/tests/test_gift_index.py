@@ -0,0 +1,43 @@
+"""
+Malformed gifts are left out of the gift index (as the scalar scorer skips
+them) instead of failing the build and every recommendation with it.
+"""
+from sqlalchemy import text
+
+from app.gift_index import GiftIndex, IndexedGift
+from app.models import db
+from app.recommendation import rank_gifts, rank_index
+
+FIELDS = IndexedGift.__slots__
+GOOD = (1, 10, 40, 20.0, 200.0, 'unisex', 'birthday', 'gamer', ['gaming', 'music'])
+BAD = [
+    (2, 'ten', 40, 20.0, 200.0, 'unisex', 'birthday', 'gamer', ['gaming']),  # text age
+    (3, 10, 40, None, 200.0, 'unisex', 'birthday', 'gamer', ['gaming']),     # missing budget
+    (4, 10, 40, 20.0, 200.0, 'unisex', 7, 'gamer', ['gaming']),              # numeric occasion
+    (5, 10, 40, 20.0, 200.0, 'unisex', 'birthday', 'gamer', 5),              # interests not a list
+    (6, 10, 40, 20.0, 200.0, 'unisex', 'birthday', 'gamer', ['gaming', 3]),  # non-text interest
+]
+CRITERIA = {'age': 20, 'budget': 100, 'interests': ['gaming'], 'occasion': 'birthday'}
+
+
+def test_malformed_rows_are_skipped_like_smart_score_skips_them():
+    rows = [GOOD] + BAD + [(7,) + GOOD[1:]]
+    index = GiftIndex(rows)
+    assert index.skipped == [2, 3, 4, 5, 6]
+    assert index.ids.tolist() == [1, 7]
+
+    raw = [IndexedGift(**dict(zip(FIELDS, row))) for row in rows]
+    expected = [(g.id, s, d) for g, s, d in rank_gifts(raw, CRITERIA, 10)]
+    assert [(g.id, s, d) for g, s, d in rank_index(index, CRITERIA, 10)] == expected
+
+
+def test_recommend_survives_a_malformed_gift(make_app):
+    app = make_app(1, 4)
+    with app.app_context():
+        db.session.execute(text("UPDATE gifts SET min_age = 'ten' WHERE id = 1"))
+        db.session.execute(text("UPDATE gifts SET interests = '5' WHERE id = 2"))
+        db.session.commit()
+
+    response = app.test_client().post('/api/v1/gifts/recommend', json=CRITERIA)
+    assert response.status_code == 200
+    assert {r['gift']['id'] for r in response.get_json()} == {3, 4}
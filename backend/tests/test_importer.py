@@ -0,0 +1,46 @@
+"""
+Bulk imports report malformed numbers as invalid rows instead of failing
+the whole import or storing a truncated value.
+"""
+import io
+import json
+
+import pytest
+
+from app.importer import import_stream
+from app.models import Gift
+
+GIFT = {'store_id': 1, 'name_ar': 'هدية', 'name_en': 'Gift', 'category': 'gaming',
+        'min_age': 10, 'max_age': 40, 'min_budget': 20, 'max_budget': 200,
+        'interests': ['gaming']}
+
+
+def import_gifts(app, *rows):
+    lines = [row if isinstance(row, str) else json.dumps(row) for row in rows]
+    with app.app_context():
+        result = import_stream(Gift, io.StringIO('\n'.join(lines) + '\n'), 'ndjson')
+        return result, {gift.name_en: gift for gift in Gift.query.all()}
+
+
+@pytest.mark.parametrize('row, error', [
+    ('{"min_age": 1e999}', 'min_age must be a finite number'),
+    ('{"max_budget": -1e999}', 'max_budget must be a finite number'),
+    ('{"min_age": 12.7}', 'min_age must be a whole number'),
+    ('{"max_age": "12.5"}', 'max_age must be a whole number'),
+    ('{"min_budget": "cheap"}', 'min_budget must be a number'),
+], ids=['int-overflow', 'float-infinite', 'int-fraction', 'int-fraction-text', 'float-text'])
+def test_bad_numbers_are_invalid_rows(make_app, row, error):
+    app = make_app(1, 0)
+    bad = dict(GIFT, name_en='Bad', **json.loads(row))
+    result, gifts = import_gifts(app, GIFT, json.dumps(bad))
+    assert (result['inserted'], result['invalid']) == (1, 1)
+    assert result['errors'] == [{'line': 2, 'error': error}]
+    assert set(gifts) == {'Gift'}
+
+
+def test_whole_numbers_in_any_form_are_accepted(make_app):
+    app = make_app(1, 0)
+    result, gifts = import_gifts(app, dict(GIFT, min_age=12.0, max_age='40', max_budget='99.5'))
+    assert result['inserted'] == 1
+    gift = gifts['Gift']
+    assert (gift.min_age, gift.max_age, gift.max_budget) == (12, 40, 99.5)
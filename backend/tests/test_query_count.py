@@ -0,0 +1,72 @@
+"""
+Gift listings and recommendations run a constant number of SQL statements,
+however many gifts (and stores) they return: no per-gift store lazy-loads.
+"""
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from app.auth import issue_admin_token
+from app.models import db, Admin
+
+SMALL = (2, 4)
+LARGE = (20, 120)
+
+
+@contextmanager
+def count_statements(app):
+    statements = []
+
+    def listener(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', listener)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', listener)
+
+
+def admin_headers(app):
+    with app.app_context():
+        return {'Authorization': f'Bearer {issue_admin_token(Admin.query.first())}'}
+
+
+def statement_count(app, method, url, **kwargs):
+    client = app.test_client()
+    # Warm up: gift index, snapshot and token checks are built on first use
+    assert client.open(url, method=method, **kwargs).status_code == 200
+    with count_statements(app) as statements:
+        response = client.open(url, method=method, **kwargs)
+    assert response.status_code == 200
+    return len(statements), response.get_json()
+
+
+REQUESTS = [
+    ('GET', '/api/v1/gifts', {}),
+    ('GET', '/api/v1/gifts?limit=500', {}),
+    ('GET', '/api/v1/gifts?category=gaming&max_budget=1000&limit=500', {}),
+    ('GET', '/api/v1/admin/gifts', {'admin': True}),
+    ('GET', '/api/v1/admin/gifts?limit=500', {'admin': True}),
+    ('POST', '/api/v1/gifts/recommend', {'json': {'age': 20, 'budget': 150, 'interests': ['gaming']}}),
+    ('POST', '/api/v1/gifts/recommend/batch', {'json': [{'age': 20, 'budget': 150},
+                                                        {'age': 40, 'budget': 60, 'interests': ['music']}]}),
+]
+
+
+@pytest.mark.parametrize('snapshot', [True, False], ids=['snapshot', 'live'])
+@pytest.mark.parametrize('method, url, options', REQUESTS, ids=[r[1] for r in REQUESTS])
+def test_statement_count_does_not_grow_with_gifts(make_app, snapshot, method, url, options):
+    counts = []
+    for stores, gifts in (SMALL, LARGE):
+        app = make_app(stores, gifts, RECOMMEND_CACHE_BACKEND='none', CATALOG_SNAPSHOT=snapshot)
+        kwargs = {key: value for key, value in options.items() if key != 'admin'}
+        if options.get('admin'):
+            kwargs['headers'] = admin_headers(app)
+        count, body = statement_count(app, method, url, **kwargs)
+        assert body  # the request returned rows
+        counts.append(count)
+    assert counts[0] == counts[1], f"{method} {url}: {counts[0]} statements for {SMALL}, {counts[1]} for {LARGE}"
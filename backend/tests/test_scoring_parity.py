@@ -0,0 +1,100 @@
+"""
+The vectorized engine (score_batch / rank_index) returns exactly what the
+scalar smart_score / get_recommendations path returns.
+"""
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from app.gift_index import GiftIndex, IndexedGift
+from app.recommendation import (batch_details, get_recommendations, rank_gifts, rank_index,
+                                score_batch, smart_score)
+from benchmarks.synthetic import criteria, gift_rows
+
+SAMPLES = criteria(60, seed=11) + [
+    {'age': 25, 'budget': 100},                                   # no interests
+    {'age': 1, 'budget': 5, 'interests': ['Gaming ', 'unknown']},  # unnormalized / unknown
+    {'age': 80, 'budget': 1000, 'occasion': 'Birthday ', 'personality_type': 'Gamer'},
+]
+
+
+@pytest.fixture(scope='module')
+def index():
+    return GiftIndex(gift_rows(1_500, seed=3))
+
+
+def _messy(rng: random.Random, value):
+    """``value`` as a client might have stored it: odd case, padding, blank or null."""
+    return rng.choice([value, value.upper(), value.title(), f'  {value} ', f'{value}\t', '', None])
+
+
+@pytest.fixture(scope='module')
+def raw_gifts():
+    """
+    Unnormalized gift objects, some with null or missing text and interest
+    fields, paired with an index built from the same raw values.
+    """
+    rng = random.Random(5)
+    gifts, rows = [], []
+    for row in gift_rows(1_500, seed=7):
+        fields = dict(zip(IndexedGift.__slots__, row))
+        for name in ('gender', 'occasion', 'personality_type'):
+            fields[name] = _messy(rng, fields[name])
+        interests = [_messy(rng, name) for name in fields['interests']]
+        fields['interests'] = rng.choice([interests, interests + interests[:1], [], None])
+        for name in ('occasion', 'personality_type', 'interests'):
+            if rng.random() < 0.05:
+                del fields[name]  # smart_score falls back to its getattr default
+        gifts.append(SimpleNamespace(**fields))
+        rows.append(tuple(fields.get(name) for name in IndexedGift.__slots__))
+    return gifts, GiftIndex(rows)
+
+
+@pytest.mark.parametrize('item', SAMPLES)
+def test_score_batch_matches_smart_score(index, item):
+    scores, components = score_batch(index, item)
+    for row, gift in enumerate(index.gifts()):
+        expected_score, expected_details = smart_score(gift, item)
+        score = scores[row].item()
+        assert score == expected_score, (row, score, expected_score)
+        assert batch_details(index, row, score, components, item) == expected_details, row
+
+
+@pytest.mark.parametrize('item', SAMPLES)
+def test_score_batch_matches_smart_score_on_raw_gifts(raw_gifts, item):
+    gifts, index = raw_gifts
+    assert len(index) == len(gifts) and not index.skipped
+    scores, components = score_batch(index, item)
+    for row, gift in enumerate(gifts):
+        expected_score, expected_details = smart_score(gift, item)
+        score = scores[row].item()
+        assert score == expected_score, (row, vars(gift), score, expected_score)
+        assert batch_details(index, row, score, components, item) == expected_details, vars(gift)
+
+
+@pytest.mark.parametrize('use_prefilter', [False, True], ids=['exhaustive', 'prefilter'])
+def test_rank_index_matches_rank_gifts_on_raw_gifts(raw_gifts, use_prefilter):
+    gifts, index = raw_gifts
+    for item in SAMPLES:
+        expected = [(g.id, s, d) for g, s, d in rank_gifts(gifts, item, 25)]
+        ranked = rank_index(index, item, 25, use_prefilter=use_prefilter)
+        assert [(g.id, s, d) for g, s, d in ranked] == expected, item
+
+
+@pytest.mark.parametrize('use_prefilter', [False, True], ids=['exhaustive', 'prefilter'])
+@pytest.mark.parametrize('limit', [1, 4, 25])
+def test_rank_index_matches_rank_gifts(index, limit, use_prefilter):
+    for item in SAMPLES:
+        expected = [(g.id, s, d) for g, s, d in rank_gifts(index.gifts(), item, limit)]
+        ranked = rank_index(index, item, limit, use_prefilter=use_prefilter)
+        assert [(g.id, s, d) for g, s, d in ranked] == expected, item
+
+
+def test_rank_index_matches_get_recommendations(index):
+    gifts = list(index.gifts())
+    for item in SAMPLES:
+        expected = [(r['gift'].id, r['score'], r['match_details'])
+                    for r in get_recommendations(gifts, item)]
+        ranked = [(g.id, round(s / 100, 2), d) for g, s, d in rank_index(index, item)]
+        assert ranked == expected, item
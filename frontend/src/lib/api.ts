@@ -66,6 +66,33 @@ export interface Gift {
   store?: Store;
 }
 
+// Keyset-paginated list response (?after_id=&limit=)
+export interface Page<T> {
+  items: T[];
+  next_after_id: number | null;
+  limit: number;
+}
+
+export interface PageParams {
+  after_id?: number;
+  limit?: number;
+  fields?: string[];
+}
+
+// Fields shown by the gift listing cards (no bilingual descriptions)
+export const GIFT_LIST_FIELDS = [
+  'id',
+  'name_ar',
+  'name_en',
+  'category',
+  'min_age',
+  'max_age',
+  'min_budget',
+  'max_budget',
+  'image_url',
+  'store',
+];
+
 export interface RecommendationCriteria {
   age: number;
   budget: number;
@@ -74,6 +101,8 @@ export interface RecommendationCriteria {
   occasion?: string;
   personality_type?: string;
   relationship?: string;
+  /** Only consider gifts sharing at least one of `interests`. */
+  strict_interests?: boolean;
 }
 
 export interface Recommendation {
@@ -101,6 +130,32 @@ export async function getGifts(
   return handleResponse<Gift[]>(res);
 }
 
+function pageQuery(
+  params: PageParams,
+  filters?: Record<string, any>
+): string {
+  const query = new URLSearchParams(filters);
+  if (params.after_id !== undefined) query.set('after_id', String(params.after_id));
+  if (params.limit !== undefined) query.set('limit', String(params.limit));
+  if (params.fields?.length) query.set('fields', params.fields.join(','));
+  return query.toString();
+}
+
+export async function getGiftsPage(
+  params: PageParams = {},
+  filters?: Record<string, any>
+): Promise<Page<Partial<Gift>>> {
+  const res = await fetch(`${API_BASE_URL}/gifts?${pageQuery(params, filters)}`);
+  return handleResponse<Page<Partial<Gift>>>(res);
+}
+
+export async function getStoresPage(
+  params: PageParams = {}
+): Promise<Page<Partial<Store>>> {
+  const res = await fetch(`${API_BASE_URL}/stores?${pageQuery(params)}`);
+  return handleResponse<Page<Partial<Store>>>(res);
+}
+
 export async function getRecommendations(
   criteria: RecommendationCriteria
 ): Promise<Recommendation[]> {
@@ -112,6 +167,18 @@ export async function getRecommendations(
   return handleResponse<Recommendation[]>(res);
 }
 
+/** One result list per criteria object, in the same order. */
+export async function getRecommendationsBatch(
+  criteria: RecommendationCriteria[]
+): Promise<Recommendation[][]> {
+  const res = await fetch(`${API_BASE_URL}/gifts/recommend/batch`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(criteria),
+  });
+  return handleResponse<Recommendation[][]>(res);
+}
+
 export async function getInterests(): Promise<string[]> {
   const res = await fetch(`${API_BASE_URL}/interests`);
   return handleResponse<string[]>(res);
@@ -156,6 +223,33 @@ export async function getAdminStats(): Promise<any> {
   return handleResponse(res);
 }
 
+// ===============================
+// Admin Bulk Changes
+// ===============================
+
+export interface BulkResult {
+  succeeded: number;
+  failed: number;
+  /** One entry per submitted item, in order; failed items carry `error`. */
+  results: { index: number; id?: number; error?: string }[];
+}
+
+async function adminBulk(
+  resource: 'stores' | 'gifts',
+  method: 'POST' | 'PATCH' | 'DELETE',
+  body: unknown[]
+): Promise<BulkResult> {
+  const res = await fetch(`${API_BASE_URL}/admin/${resource}/bulk`, {
+    method,
+    headers: {
+      'Content-Type': 'application/json',
+      ...getAuthHeaders(),
+    },
+    body: JSON.stringify(body),
+  });
+  return handleResponse<BulkResult>(res);
+}
+
 // ===============================
 // Admin Stores
 // ===============================
@@ -204,6 +298,20 @@ export async function deleteStore(id: number): Promise<void> {
   await handleResponse(res);
 }
 
+export function bulkCreateStores(stores: Partial<Store>[]): Promise<BulkResult> {
+  return adminBulk('stores', 'POST', stores);
+}
+
+export function bulkUpdateStores(
+  stores: (Partial<Store> & { id: number })[]
+): Promise<BulkResult> {
+  return adminBulk('stores', 'PATCH', stores);
+}
+
+export function bulkDeleteStores(ids: number[]): Promise<BulkResult> {
+  return adminBulk('stores', 'DELETE', ids);
+}
+
 // ===============================
 // Admin Gifts
 // ===============================
@@ -251,3 +359,18 @@ export async function deleteGift(id: number): Promise<void> {
   });
   await handleResponse(res);
 }
+
+export function bulkCreateGifts(gifts: Partial<Gift>[]): Promise<BulkResult> {
+  return adminBulk('gifts', 'POST', gifts);
+}
+
+/** Partial updates in one transaction, e.g. re-pricing a season's catalog. */
+export function bulkUpdateGifts(
+  gifts: (Partial<Gift> & { id: number })[]
+): Promise<BulkResult> {
+  return adminBulk('gifts', 'PATCH', gifts);
+}
+
+export function bulkDeleteGifts(ids: number[]): Promise<BulkResult> {
+  return adminBulk('gifts', 'DELETE', ids);
+}